@@ -8,6 +8,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
 from datetime import timezone, timedelta, datetime as dt_class
 
 # ============================================
@@ -64,8 +65,10 @@ def load_cameras_from_env() -> List[CameraConfig]:
             rtsp_user = os.getenv('RTSP_USER')
             rtsp_password = os.getenv('RTSP_PASSWORD')
             
-            if rtsp_user and rtsp_password and 'rtsp://' in url and '@' not in url:
-                url = url.replace('rtsp://', f'rtsp://{rtsp_user}:{rtsp_password}@')
+            if rtsp_user and rtsp_password:
+                parts = urlsplit(url)
+                if parts.scheme == 'rtsp' and '@' not in parts.netloc:
+                    url = parts._replace(netloc=f'{rtsp_user}:{rtsp_password}@{parts.netloc}').geturl()
             
             cam_config = CameraConfig(
                 id=camera_id,
@@ -97,8 +100,17 @@ YOLO_MODEL = os.getenv("YOLO_MODEL", "yolov10s.pt")  # YOLOv10s for better pose/
 DETECTION_CONFIDENCE = float(os.getenv("DETECTION_CONFIDENCE", "0.35"))
 YOLO_IMGSZ = int(os.getenv("YOLO_IMGSZ", "960"))  # Input resolution (higher = better far detection)
 YOLO_USE_OPENVINO = os.getenv("YOLO_USE_OPENVINO", "true").lower() == "true"  # Auto-select OpenVINO
+YOLO_USE_TENSORRT = os.getenv("YOLO_USE_TENSORRT", "true").lower() == "true"  # Auto-select TensorRT engine (NVIDIA)
+YOLO_HALF = os.getenv("YOLO_HALF", "true").lower() == "true"  # FP16 inference when running PyTorch on CUDA
 PERSON_CLASS_ID = 0  # COCO class 0 = person
 
+# Motion gate: reuse the last detections while the (downscaled, gray) frame is
+# unchanged. Mean abs pixel difference threshold on 0-255; 0 disables the gate.
+MOTION_GATE_THRESHOLD = float(os.getenv("MOTION_GATE_THRESHOLD", "2.0"))
+MOTION_GATE_MAX_AGE = float(os.getenv("MOTION_GATE_MAX_AGE", "2.0"))  # seconds before YOLO must re-run
+# Off-screen cameras run YOLO on every N-th new frame (entry/exit thresholds are seconds)
+DETECTION_STRIDE_BG = max(1, int(os.getenv("DETECTION_STRIDE_BG", "3")))
+
 # Occupancy Engine settings (in seconds)
 # Employee zones
 ENTRY_THRESHOLD = float(os.getenv("ENTRY_THRESHOLD", "3.0"))  # 3 sec check
@@ -131,6 +143,7 @@ AUTO_CYCLE_PAUSE_DURATION = 30.0  # seconds to pause after manual switch
 # Display settings
 WINDOW_NAME = "Workplace Monitoring"
 FULLSCREEN_MODE = os.getenv("FULLSCREEN_MODE", "false").lower() == "true"
+UI_TARGET_FPS = float(os.getenv("UI_TARGET_FPS", "30"))  # Main loop pacing (waitKey absorbs the slack)
 ROI_COLOR_VACANT = (0, 255, 0)      # Green
 ROI_COLOR_OCCUPIED = (0, 0, 255)    # Red
 ROI_COLOR_DRAWING = (255, 255, 0)   # Cyan
@@ -142,6 +155,12 @@ LINE_THICKNESS = 2
 FRAME_WIDTH = int(os.getenv("FRAME_WIDTH", "1920"))
 FRAME_HEIGHT = int(os.getenv("FRAME_HEIGHT", "1080"))
 
+# RTSP decoding: "ffmpeg" (software) or "gstreamer" (GST_DECODE fragment, e.g.
+# "rtph264depay ! h264parse ! nvv4l2decoder ! nvvideoconvert" on Jetson or
+# "... ! vaapih264dec" on Intel). Falls back to FFmpeg if GStreamer is unavailable.
+RTSP_BACKEND = os.getenv("RTSP_BACKEND", "ffmpeg").lower()
+GST_DECODE = os.getenv("GST_DECODE", "rtph264depay ! h264parse ! decodebin")
+
 
 def print_config():
     """Print current configuration"""
@@ -153,7 +172,11 @@ def print_config():
         print("[WARN]  No cameras configured!")
     else:
         for cam in CAMERAS:
-            display_url = re.sub(r'://[^:]+:[^@]+@', '://***:***@', cam.url)
+            parts = urlsplit(cam.url)
+            display_url = cam.url
+            if '@' in parts.netloc:
+                host = parts.netloc.rpartition('@')[2]
+                display_url = parts._replace(netloc=f'***:***@{host}').geturl()
             print(f"  Camera {cam.id}: {cam.name}")
             print(f"           URL: {display_url}")
     
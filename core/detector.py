@@ -6,14 +6,12 @@ otherwise falls back to the original .pt model (PyTorch).
 """
 import cv2
 import numpy as np
-import sys
 from pathlib import Path
 from typing import List, Tuple, NamedTuple
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import (
     YOLO_MODEL, DETECTION_CONFIDENCE, PERSON_CLASS_ID,
-    YOLO_IMGSZ, YOLO_USE_OPENVINO
+    YOLO_IMGSZ, YOLO_USE_OPENVINO, YOLO_USE_TENSORRT, YOLO_HALF, CAMERAS
 )
 
 
@@ -43,16 +41,27 @@ def _find_openvino_model(pt_path: str) -> str | None:
     return None
 
 
+def _find_tensorrt_engine(pt_path: str) -> str | None:
+    """
+    Look for a TensorRT engine next to the .pt file.
+    
+    Convention: yolov10s.pt → yolov10s.engine (scripts/export_tensorrt.py)
+    """
+    engine = Path(pt_path).with_suffix(".engine")
+    return str(engine) if engine.is_file() else None
+
+
 class PersonDetector:
-    """YOLOv10s-based person detector with OpenVINO support"""
+    """YOLOv10s-based person detector with TensorRT / OpenVINO support"""
     
     def __init__(self, model_path: str = None):
         """
-        Initialize detector with automatic OpenVINO selection.
+        Initialize detector with automatic TensorRT / OpenVINO selection.
         
         Priority:
-        1. OpenVINO model (if YOLO_USE_OPENVINO=true and model dir exists)
-        2. Original .pt model (PyTorch fallback)
+        1. TensorRT engine (if YOLO_USE_TENSORRT=true and .engine exists)
+        2. OpenVINO model (if YOLO_USE_OPENVINO=true and model dir exists)
+        3. Original .pt model (PyTorch fallback)
         
         Args:
             model_path: Path to YOLO .pt model. If None, uses config default.
@@ -62,8 +71,11 @@ class PersonDetector:
         model_path = model_path or YOLO_MODEL
         self.backend = "PyTorch"  # Default
         
-        # Try OpenVINO first
-        if YOLO_USE_OPENVINO:
+        # Try TensorRT first (NVIDIA GPU), then OpenVINO
+        engine_path = _find_tensorrt_engine(model_path) if YOLO_USE_TENSORRT else None
+        if engine_path and self._load_tensorrt(YOLO, engine_path):
+            pass  # Engine loaded and warmed up
+        elif YOLO_USE_OPENVINO:
             openvino_path = _find_openvino_model(model_path)
             
             if openvino_path:
@@ -92,6 +104,60 @@ class PersonDetector:
         
         self.confidence = DETECTION_CONFIDENCE
         self.imgsz = YOLO_IMGSZ
+        # Frames per forward pass the loaded model accepts (None = any)
+        self.max_batch = self._model_max_batch()
+        if self.max_batch is not None and self.max_batch < len(CAMERAS):
+            script = "export_tensorrt.py" if self.backend == "TensorRT" else "export_openvino.py"
+            print(f"ℹ️ {self.backend} model takes {self.max_batch} frame(s) per pass — "
+                  f"{len(CAMERAS)} cameras run in chunks of {self.max_batch}")
+            print(f"💡 Tip: Run 'python scripts/{script} --batch {len(CAMERAS)}' "
+                  f"for one forward pass per tick")
+        
+        # PyTorch on a CUDA GPU: pin the device and run FP16 (half the memory
+        # traffic, Tensor Core kernels). OpenVINO picks its own precision.
+        self.device = None
+        self.half = False
+        if self.backend == "PyTorch":
+            import torch
+            if torch.cuda.is_available():
+                self.device = 0
+                self.half = YOLO_HALF
+                print(f"⚡ CUDA device: {torch.cuda.get_device_name(0)} ({'FP16' if self.half else 'FP32'})")
+    
+    def _load_tensorrt(self, YOLO, engine_path: str) -> bool:
+        """Load + warm up a TensorRT engine; False (nothing changed) on failure"""
+        print(f"🚀 Loading TensorRT engine: {engine_path}")
+        try:
+            model = YOLO(engine_path, task="detect")
+            # First inference sets up the CUDA context — pay it here, not on the first frame
+            dummy = np.zeros((YOLO_IMGSZ, YOLO_IMGSZ, 3), dtype=np.uint8)
+            model(dummy, imgsz=YOLO_IMGSZ, verbose=False)
+        except Exception as e:
+            print(f"⚠️ TensorRT load failed ({e}), trying OpenVINO / .pt")
+            return False
+        
+        self.model = model
+        self.backend = "TensorRT"
+        print(f"✅ YOLO model loaded (TensorRT backend, imgsz={YOLO_IMGSZ})")
+        return True
+    
+    def _model_max_batch(self) -> int | None:
+        """
+        Read the batch limit of an exported model from its metadata.
+        
+        Exported graphs (OpenVINO IR, TensorRT engine) have a fixed input
+        shape unless exported with dynamic=True: a static model takes exactly
+        one frame per call, a dynamic one up to its export batch.
+        """
+        if self.backend == "PyTorch":
+            return None
+        
+        # Populated by the warmup inference (AutoBackend keeps the export metadata)
+        backend = getattr(getattr(self.model, "predictor", None), "model", None)
+        metadata = getattr(backend, "metadata", None) or {}
+        if not metadata.get("args", {}).get("dynamic", False):
+            return 1
+        return max(1, int(metadata.get("batch", 1)))
     
     def detect(self, frame: np.ndarray) -> List[Detection]:
         """
@@ -103,38 +169,95 @@ class PersonDetector:
         Returns:
             List of Detection objects
         """
-        # Run inference with configured input size
-        results = self.model(
-            frame, 
-            classes=[PERSON_CLASS_ID],  # Only detect persons
-            conf=self.confidence,
-            imgsz=self.imgsz,
-            verbose=False
-        )
+        small, scale = self.downscale(frame)
+        return self.detect_batch([small], [scale])[0]
+    
+    def downscale(self, frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Shrink a frame to the model input size (long side = imgsz) once
+        
+        INTER_AREA down-sampling is done here a single time so the result can
+        be shared (e.g. with the motion gate) and YOLO's own letterbox only
+        pads instead of resizing a full 1080p frame again.
+        
+        Returns:
+            (resized frame, factor mapping its coordinates back to the original)
+        """
+        h, w = frame.shape[:2]
+        long_side = max(h, w)
+        if long_side <= self.imgsz:
+            return frame, 1.0
         
+        ratio = self.imgsz / long_side
+        size = (round(w * ratio), round(h * ratio))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return small, w / size[0]
+    
+    def detect_batch(self, frames: List[np.ndarray],
+                     scales: List[float] = None) -> List[List[Detection]]:
+        """
+        Detect persons in several frames with a single model call
+        
+        Args:
+            frames: BGR images (e.g. the latest frame of each camera)
+            scales: Per-frame factor from downscale(); boxes are mapped back
+                to original frame coordinates. None = frames are full size.
+        
+        Returns:
+            One list of Detection objects per input frame, in order
+        """
+        if not frames:
+            return []
+        if scales is None:
+            scales = [1.0] * len(frames)
+        
+        # Run inference with configured input size: one forward pass per chunk
+        # the model accepts (all frames at once for PyTorch / dynamic models)
+        step = self.max_batch or len(frames)
+        detections = []
+        for start in range(0, len(frames), step):
+            results = self.model(
+                frames[start:start + step], 
+                classes=[PERSON_CLASS_ID],  # Only detect persons
+                conf=self.confidence,
+                imgsz=self.imgsz,
+                device=self.device,
+                half=self.half,
+                verbose=False
+            )
+            detections.extend(
+                self._to_detections(result, scale)
+                for result, scale in zip(results, scales[start:start + step])
+            )
+        
+        return detections
+    
+    @staticmethod
+    def _to_detections(result, scale: float = 1.0) -> List[Detection]:
+        """Convert one YOLO result into Detection tuples (boxes multiplied by scale)"""
         detections = []
+        boxes = result.boxes
         
-        for result in results:
-            boxes = result.boxes
-            
-            if boxes is None:
-                continue
-            
-            for box in boxes:
-                # Get bounding box
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-                confidence = float(box.conf[0].cpu().numpy())
-                
-                # Calculate center
-                center_x = int((x1 + x2) // 2)
-                center_y = int((y1 + y2) // 2)
-                
-                detection = Detection(
-                    bbox=(int(x1), int(y1), int(x2), int(y2)),
-                    confidence=confidence,
-                    center=(center_x, center_y)
-                )
-                detections.append(detection)
+        if boxes is None or len(boxes) == 0:
+            return detections
+        
+        # One host copy for all boxes of the result (not two tensor ops per box)
+        xyxy = boxes.xyxy.cpu().numpy()
+        if scale != 1.0:
+            xyxy = xyxy * scale
+        xyxy = xyxy.astype(int)
+        confidences = boxes.conf.cpu().numpy()
+        # Calculate centers for the whole batch
+        centers = (xyxy[:, :2] + xyxy[:, 2:]) // 2
+        
+        for (x1, y1, x2, y2), confidence, (center_x, center_y) in zip(
+            xyxy.tolist(), confidences.tolist(), centers.tolist()
+        ):
+            detections.append(Detection(
+                bbox=(x1, y1, x2, y2),
+                confidence=confidence,
+                center=(center_x, center_y)
+            ))
         
         return detections
     
@@ -169,7 +292,7 @@ class PersonDetector:
 
 
 if __name__ == "__main__":
-    # Test detector with webcam
+    # Test detector with webcam (from the project root: python -m core.detector)
     from core.stream_handler import StreamHandler
     
     print("Testing PersonDetector with webcam...")
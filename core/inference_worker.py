@@ -0,0 +1,130 @@
+"""
+Background YOLO inference
+Runs the shared detector for all cameras on its own thread so inference
+latency never stalls the UI loop (capture is already threaded per stream).
+"""
+import cv2
+import threading
+import time
+from typing import Callable, List, Optional
+
+from config import MOTION_GATE_THRESHOLD, MOTION_GATE_MAX_AGE, DETECTION_STRIDE_BG
+
+# Thumbnail size for the motion gate (16:9, cheap to diff)
+_GATE_SIZE = (160, 90)
+
+
+class InferenceWorker:
+    """Detects persons on the freshest frame of each camera and publishes the result"""
+
+    def __init__(self, detector, cameras: List, get_focus_camera: Optional[Callable] = None):
+        """
+        Args:
+            detector: Shared PersonDetector instance
+            cameras: CameraMonitor list (results go to camera.last_detections)
+            get_focus_camera: Returns the on-screen camera (full cadence); the
+                others run every DETECTION_STRIDE_BG new frames
+        """
+        self.detector = detector
+        self.cameras = cameras
+        self.get_focus_camera = get_focus_camera
+        self.is_running = False
+        self.thread = None
+        # camera_db_id -> capture timestamp of the last frame we ran detection on
+        self._last_frame_time = {}
+        # camera_db_id -> (gray thumbnail, monotonic time) of the last YOLO run
+        self._last_inference = {}
+        # camera_db_id -> new frames passed over since the last background run
+        self._skipped = {}
+
+    def start(self):
+        """Start the inference thread"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print("[INFO] Inference worker started")
+
+    def stop(self):
+        """Stop the inference thread"""
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+
+    def _run(self):
+        """Collect the new frames of all cameras and run YOLO on them in one batch"""
+        while self.is_running:
+            batch = []  # (camera, frame_time, thumbnail, resized frame, scale)
+            focus = self.get_focus_camera() if self.get_focus_camera else None
+
+            for camera in self.cameras:
+                # Process only connected cameras that have zones
+                if not camera.is_connected or not camera.roi_manager.get_all_rois():
+                    continue
+
+                frame_time = camera.stream.last_frame_time
+                if self._last_frame_time.get(camera.camera_db_id) == frame_time:
+                    continue  # No new frame since the last detection
+
+                # Off-screen camera: keep its detections for a few new frames
+                if focus is not None and camera is not focus:
+                    skipped = self._skipped.get(camera.camera_db_id, 0) + 1
+                    if skipped < DETECTION_STRIDE_BG:
+                        self._skipped[camera.camera_db_id] = skipped
+                        self._last_frame_time[camera.camera_db_id] = frame_time
+                        continue
+                self._skipped[camera.camera_db_id] = 0
+
+                ret, frame = camera.stream.read_frame(copy=False)  # Read-only use
+                if not ret:
+                    continue
+
+                # One INTER_AREA resize, shared by the motion gate and YOLO
+                small, scale = self.detector.downscale(frame)
+
+                # Static scene and recent detections: keep them, skip YOLO
+                thumb = self._thumbnail(small)
+                if self._is_static(camera.camera_db_id, thumb):
+                    self._last_frame_time[camera.camera_db_id] = frame_time
+                    continue
+
+                batch.append((camera, frame_time, thumb, small, scale))
+
+            if not batch:
+                time.sleep(0.01)  # Nothing new yet — don't spin
+                continue
+
+            try:
+                results = self.detector.detect_batch(
+                    [item[3] for item in batch], [item[4] for item in batch]
+                )
+            except Exception as e:
+                print(f"⚠️ Detection failed for {len(batch)} camera(s): {e}")
+                time.sleep(0.5)
+                continue
+
+            inferred_at = time.monotonic()
+            for (camera, frame_time, thumb, _, _), detections in zip(batch, results):
+                # Single attribute swap: the UI thread always sees a complete list
+                camera.last_detections = detections
+                self._last_frame_time[camera.camera_db_id] = frame_time
+                self._last_inference[camera.camera_db_id] = (thumb, inferred_at)
+
+    @staticmethod
+    def _thumbnail(frame):
+        """Small grayscale copy of a frame for the motion gate"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, _GATE_SIZE, interpolation=cv2.INTER_AREA)
+
+    def _is_static(self, camera_id: int, thumb) -> bool:
+        """True if the frame barely differs from the one YOLO last saw, and that was recent"""
+        if MOTION_GATE_THRESHOLD <= 0:
+            return False
+        last = self._last_inference.get(camera_id)
+        if last is None:
+            return False
+        last_thumb, inferred_at = last
+        if time.monotonic() - inferred_at >= MOTION_GATE_MAX_AGE:
+            return False
+        return cv2.absdiff(thumb, last_thumb).mean() < MOTION_GATE_THRESHOLD
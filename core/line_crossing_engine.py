@@ -228,10 +228,20 @@ class LineCrossingEngine:
 
     def draw_line_and_stats(self, frame, draw_stats: bool = True):
         """Draws the transparent line, direction arrow, and (optionally) the total count."""
-        # Draw dotted/semi-transparent line
-        overlay = frame.copy()
-        cv2.line(overlay, self.line_start, self.line_end, (255, 0, 0), 3)
-        cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
+        # Draw dotted/semi-transparent line (blend only the line's bounding box)
+        pad = 3
+        x1 = max(0, min(self.line_start[0], self.line_end[0]) - pad)
+        y1 = max(0, min(self.line_start[1], self.line_end[1]) - pad)
+        x2 = max(self.line_start[0], self.line_end[0]) + pad + 1
+        y2 = max(self.line_start[1], self.line_end[1]) + pad + 1
+        region = frame[y1:y2, x1:x2]
+        if region.size:
+            overlay = region.copy()
+            cv2.line(overlay,
+                     (self.line_start[0] - x1, self.line_start[1] - y1),
+                     (self.line_end[0] - x1, self.line_end[1] - y1),
+                     (255, 0, 0), 3)
+            cv2.addWeighted(overlay, 0.5, region, 0.5, 0, region)
 
         # Draw direction arrow
         mx = int((self.line_start[0] + self.line_end[0]) / 2)
@@ -10,14 +10,11 @@ Implements the state machine:
 - CHECKING_EXIT → VACANT (gone > 10 sec) → session saved to DB
 """
 import time
-import sys
-from pathlib import Path
 from enum import Enum
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Callable
 from datetime import datetime, date, timedelta
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import ENTRY_THRESHOLD, EXIT_THRESHOLD, CHECKPOINT_INTERVAL, tashkent_now
 from database.db import db
 
@@ -101,11 +98,24 @@ class OccupancyEngine:
             is_person_present: Whether a person is currently detected in zone
             zone_type: "employee" or "client"
             linked_employee_id: For client zones, the employee who gets credit
+        
+        Returns:
+            Display status of the zone after the update
+        """
+        return self.update_many([(zone_id, is_person_present, zone_type, linked_employee_id)])[0]
+    
+    def update_many(self, zones):
+        """
+        Update several zones from one frame: clock and working hours are read once
+        
+        Args:
+            zones: Iterable of (zone_id, is_person_present, zone_type, linked_employee_id)
+        
+        Returns:
+            Display status of each zone after the update, in input order
         """
-        tracker = self.get_or_create_tracker(zone_id)
         current_time = time.time()
         
-        # Determine thresholds based on zone type
         from config import (
             ENTRY_THRESHOLD, EXIT_THRESHOLD, CLIENT_ENTRY_THRESHOLD, 
             CLIENT_EXIT_THRESHOLD, RESTRICTED_DAYS, WORK_START, WORK_END
@@ -115,15 +125,38 @@ class OccupancyEngine:
         current_time_str = now_tashkent.strftime("%H:%M")
         
         # Block session mapping on weekends/restricted days AND outside working hours
-        if now_tashkent.weekday() in RESTRICTED_DAYS or not (WORK_START <= current_time_str <= WORK_END):
-            is_person_present = False
+        is_working_hours = not (now_tashkent.weekday() in RESTRICTED_DAYS
+                                or not (WORK_START <= current_time_str <= WORK_END))
         
-        if zone_type == "client":
-            entry_thresh = CLIENT_ENTRY_THRESHOLD
-            exit_thresh = CLIENT_EXIT_THRESHOLD
-        else:
-            entry_thresh = ENTRY_THRESHOLD
-            exit_thresh = EXIT_THRESHOLD
+        statuses = []
+        for zone_id, is_person_present, zone_type, linked_employee_id in zones:
+            is_person_present = is_person_present and is_working_hours
+            tracker = self.get_or_create_tracker(zone_id)
+            
+            # Steady empty zone: no pending timer, nothing can change
+            if not is_person_present and tracker.state is ZoneState.VACANT:
+                statuses.append("VACANT")
+                continue
+            
+            # Determine thresholds based on zone type
+            if zone_type == "client":
+                thresholds = (CLIENT_ENTRY_THRESHOLD, CLIENT_EXIT_THRESHOLD)
+            else:
+                thresholds = (ENTRY_THRESHOLD, EXIT_THRESHOLD)
+            
+            self._update_zone(
+                tracker, current_time, thresholds,
+                is_person_present, zone_type, linked_employee_id
+            )
+            statuses.append(tracker.get_display_status())
+        
+        return statuses
+    
+    def _update_zone(self, tracker: ZoneTracker, current_time: float, thresholds: tuple,
+                     is_person_present: bool, zone_type: str, linked_employee_id: Optional[int]):
+        """Advance one zone's state machine (thresholds = (entry, exit) seconds)"""
+        zone_id = tracker.zone_id
+        entry_thresh, exit_thresh = thresholds
         
         if tracker.state == ZoneState.VACANT:
             if is_person_present:
@@ -418,7 +451,7 @@ class OccupancyEngine:
 
 
 if __name__ == "__main__":
-    # Test Occupancy Engine
+    # Test Occupancy Engine (from the project root: python -m core.occupancy_engine)
     import time
     
     print("Testing OccupancyEngine...")
@@ -4,13 +4,12 @@ Manages workplace zones for a specific camera
 Fixed sequential numbering with gap-filling.
 """
 import cv2
+import itertools
 import numpy as np
-import sys
-from pathlib import Path
+import operator
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass, field
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db import db
 
 
@@ -25,24 +24,68 @@ class ROI:
     zone_type: str = "employee"       # "employee" or "client"
     employee_id: int = None           # Employee assigned to this zone
     linked_employee_id: int = None    # For client zones: which employee gets credit
+    
+    # Cached geometry, rebuilt whenever points is reassigned (don't edit the list in place)
+    _polygon: np.ndarray = field(init=False, repr=False, compare=False)
+    _bbox: Optional[Tuple[int, int, int, int]] = field(init=False, repr=False, compare=False)
+    _centroid: Optional[Tuple[int, int]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._update_geometry()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # __init__ sets points before the cache exists; __post_init__ builds it then
+        if name == "points" and "_polygon" in self.__dict__:
+            self._update_geometry()
+
+    def _update_geometry(self):
+        self._polygon = np.array(self.points, dtype=np.int32).reshape(-1, 2)
+        if len(self._polygon) > 0:
+            min_x, min_y = self._polygon.min(axis=0)
+            max_x, max_y = self._polygon.max(axis=0)
+            self._bbox = (int(min_x), int(min_y), int(max_x), int(max_y))
+        else:
+            self._bbox = None
+        
+        self._centroid = None
+        if len(self._polygon) > 0:
+            M = cv2.moments(self._polygon)
+            if M["m00"] != 0:
+                self._centroid = (int(M["m10"] / M["m00"]), int(M["m01"] / M["m00"]))
 
     def contains_point(self, point: Tuple[int, int]) -> bool:
         """Check if a point is inside the polygon"""
         if len(self.points) < 3:
             return False
         
-        pts = np.array(self.points, dtype=np.int32)
-        result = cv2.pointPolygonTest(pts, point, False)
+        # Cheap reject: outside the bounding box can't be inside (or on) the polygon
+        min_x, min_y, max_x, max_y = self._bbox
+        if not (min_x <= point[0] <= max_x and min_y <= point[1] <= max_y):
+            return False
+        
+        result = cv2.pointPolygonTest(self._polygon, point, False)
         return result >= 0
 
     def get_polygon_array(self) -> np.ndarray:
-        """Get polygon as numpy array for drawing"""
-        return np.array(self.points, dtype=np.int32)
+        """Get polygon as numpy array for drawing (cached — do not modify)"""
+        return self._polygon
+
+    def get_bbox(self) -> Optional[Tuple[int, int, int, int]]:
+        """Get cached bounding box as (min_x, min_y, max_x, max_y)"""
+        return self._bbox
+
+    def get_centroid(self) -> Optional[Tuple[int, int]]:
+        """Get cached polygon centroid (None for a zero-area polygon)"""
+        return self._centroid
 
 
 class ROIManager:
     """Manages ROI zones for a specific camera"""
     
+    # check_presence switches to the vectorized test from this many ROI x person pairs
+    VECTORIZE_MIN_PAIRS = 100
+    
     def __init__(self, camera_id: int):
         """
         Initialize ROI manager for a specific camera.
@@ -51,6 +94,7 @@ class ROIManager:
         self.camera_id = camera_id
         self.rois: Dict[int, ROI] = {}
         self.json_path = "rois.json"
+        self._edges = None  # Stacked polygon edges for check_presence (see _edge_table)
         
         # 1. Try to load from JSON (Primary Source)
         loaded_from_json = self._load_from_json()
@@ -348,20 +392,87 @@ class ROIManager:
             person_centers: List of (x, y) center points of detected persons
         
         Returns:
-            Dict mapping ROI ID to presence bool
+            Dict mapping ROI ID to presence bool (in get_all_rois() order)
         """
-        presence = {}
-        
-        for roi_id, roi in self.rois.items():
-            is_occupied = False
-            for center in person_centers:
-                if roi.contains_point(center):
-                    is_occupied = True
-                    break
-            presence[roi_id] = is_occupied
+        # Few ROI x person pairs: per-call NumPy overhead would outweigh the win
+        if len(self.rois) * len(person_centers) < self.VECTORIZE_MIN_PAIRS:
+            presence = {}
+            for roi_id, roi in self.rois.items():
+                is_occupied = False
+                for center in person_centers:
+                    if roi.contains_point(center):
+                        is_occupied = True
+                        break
+                presence[roi_id] = is_occupied
+            return presence
+        
+        presence = dict.fromkeys(self.rois, False)
+        
+        (ids, offsets, boxes, xi, yi, yj, dx, dy, inv_slope,
+         x_lo, x_hi, y_lo, y_hi) = self._edge_table()[2]
+        if not ids:
+            return presence
+        
+        # Bounding-box pre-filter: only persons inside some ROI's box reach PNPOLY
+        centers = np.asarray(person_centers, dtype=np.float64).reshape(-1, 2)
+        px, py = centers[:, 0], centers[:, 1]
+        candidates = ((boxes[:, :1] <= px) & (px <= boxes[:, 2:3])
+                      & (boxes[:, 1:2] <= py) & (py <= boxes[:, 3:])).any(axis=0)
+        if not candidates.any():
+            return presence
+        px, py = px[candidates], py[candidates]
+        
+        # (edges, persons) broadcast of the even-odd ray-casting test (PNPOLY)
+        rel_x, rel_y = px - xi, py - yi
+        crossings = ((yi > py) != (yj > py)) & (rel_x < inv_slope * rel_y)
+        # Points exactly on an edge count as inside, like cv2.pointPolygonTest(...) >= 0
+        on_edge = ((dx * rel_y == dy * rel_x)
+                   & (x_lo <= px) & (px <= x_hi) & (y_lo <= py) & (py <= y_hi))
+        
+        # Fold edges into their ROI: odd crossing count or any edge hit -> inside
+        inside = (np.logical_xor.reduceat(crossings, offsets, axis=0)
+                  | np.logical_or.reduceat(on_edge, offsets, axis=0))
+        for roi_id, occupied in zip(ids, inside.any(axis=1).tolist()):
+            presence[roi_id] = occupied
         
         return presence
     
+    def _edge_table(self) -> tuple:
+        """
+        Edges of all ROI polygons stacked as (E, 1) columns, plus each ROI's
+        first-edge offset and (min_x, min_y, max_x, max_y) box. Rebuilt only
+        when the set of ROI objects or one of their polygons changes (assigning
+        roi.points gives the ROI a new polygon array).
+        """
+        rois = list(self.rois.values())
+        arrays = [roi.get_polygon_array() for roi in rois]
+        if (self._edges is not None and len(self._edges[0]) == len(rois)
+                and all(map(operator.is_, self._edges[0], rois))
+                and all(map(operator.is_, self._edges[1], arrays))):
+            return self._edges
+        
+        polygons = [roi for roi in rois if len(roi.points) >= 3]
+        ids = [roi.id for roi in polygons]
+        if polygons:
+            start = np.concatenate([roi.get_polygon_array() for roi in polygons]).astype(np.float64)
+            end = np.concatenate([np.roll(roi.get_polygon_array(), -1, axis=0) for roi in polygons]).astype(np.float64)
+            offsets = np.cumsum([0] + [len(roi.get_polygon_array()) for roi in polygons[:-1]])
+            boxes = np.array([roi.get_bbox() for roi in polygons], dtype=np.float64)
+        else:
+            start = end = np.empty((0, 2))
+            offsets = np.empty(0, dtype=np.intp)
+            boxes = np.empty((0, 4))
+        
+        xi, yi = start[:, :1], start[:, 1:]
+        xj, yj = end[:, :1], end[:, 1:]
+        dx, dy = xj - xi, yj - yi
+        # dx/dy; horizontal edges never straddle a ray, so their 0 is never used
+        inv_slope = np.divide(dx, dy, out=np.zeros_like(dx), where=dy != 0)
+        self._edges = (rois, arrays, (ids, offsets, boxes, xi, yi, yj, dx, dy, inv_slope,
+                                      np.minimum(xi, xj), np.maximum(xi, xj),
+                                      np.minimum(yi, yj), np.maximum(yi, yj)))
+        return self._edges
+    
     def update_status(self, roi_id: int, status: str):
         """Update ROI status"""
         if roi_id in self.rois:
@@ -373,11 +484,21 @@ class ROIManager:
         """
         Draw ROI zones on frame with zone numbers and linkage info
         """
-        overlay = frame.copy()
+        if not self.rois:
+            return frame
         
-        # Collect all ROI centers for drawing link lines
-        roi_centers = {}
+        # Pass 1: layout only. The fill blend leaves every untouched pixel as-is,
+        # so it only needs to run over the union (x1, y1, x2, y2) of what is drawn.
+        dirty = [frame.shape[1], frame.shape[0], 0, 0]
         
+        def grow(x1, y1, x2, y2):
+            dirty[0] = min(dirty[0], x1)
+            dirty[1] = min(dirty[1], y1)
+            dirty[2] = max(dirty[2], x2)
+            dirty[3] = max(dirty[3], y2)
+        
+        layout = []
+        roi_centers = {}
         for roi in self.rois.values():
             pts = roi.get_polygon_array()
             
@@ -395,17 +516,10 @@ class ROIManager:
                 else:
                     color = vacant_color  # Green
             
-            # Draw filled polygon with transparency
-            cv2.fillPoly(overlay, [pts], color)
-            
-            # Draw polygon outline
-            cv2.polylines(frame, [pts], True, color, 2)
-            
-            # Calculate centroid
-            M = cv2.moments(pts)
-            if M["m00"] != 0:
-                cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"])
+            # Cached centroid
+            centroid = roi.get_centroid()
+            if centroid is not None:
+                cx, cy = centroid
             else:
                 cx, cy = pts[0][0], pts[0][1]
             
@@ -420,10 +534,53 @@ class ROIManager:
             else:
                 label = f"Zone #{roi.id}"
             
-            # Draw label with background
-            (tw, th), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+            (tw, th), base = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
             label_x = cx - tw // 2
             label_y = cy - 10
+            (sw, sh), sbase = cv2.getTextSize(roi.status, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)
+            
+            bbox = roi.get_bbox()
+            if bbox:
+                grow(bbox[0] - 2, bbox[1] - 2, bbox[2] + 3, bbox[3] + 3)  # fill + outline
+            grow(label_x - 4, label_y - th - 4, label_x + tw + 5, label_y + max(base, 3) + 2)
+            grow(cx - 37, cy + 13 - sh, cx - 33 + sw, cy + 17 + sbase)
+            
+            layout.append((roi, pts, color, label, label_x, label_y, tw, th))
+        
+        links = []
+        for roi in self.rois.values():
+            if roi.zone_type == "client" and roi.linked_employee_id:
+                # Find the linked employee zone
+                linked_id = roi.linked_employee_id
+                if roi.id in roi_centers and linked_id in roi_centers:
+                    pt1 = roi_centers[roi.id]
+                    pt2 = roi_centers[linked_id]
+                    links.append((pt1, pt2))
+                    pad = 18  # dash thickness + arrowhead size
+                    grow(min(pt1[0], pt2[0]) - pad, min(pt1[1], pt2[1]) - pad,
+                         max(pt1[0], pt2[0]) + pad, max(pt1[1], pt2[1]) + pad)
+        
+        x1, y1 = max(dirty[0], 0), max(dirty[1], 0)
+        x2, y2 = min(dirty[2], frame.shape[1]), min(dirty[3], frame.shape[0])
+        if x2 <= x1 or y2 <= y1:
+            return frame
+        
+        # Pass 2: fills go to an overlay of the dirty region only, the rest onto frame
+        region = frame[y1:y2, x1:x2]
+        overlay = region.copy()
+        
+        for roi, pts, color, label, label_x, label_y, tw, th in layout:
+            # Draw filled polygon with transparency (one call per zone: a
+            # multi-polygon fillPoly would XOR-out overlapping zones)
+            cv2.fillPoly(overlay, [pts], color, offset=(-x1, -y1))
+        
+        # Draw polygon outlines, one call per run of same-coloured zones
+        for color, group in itertools.groupby(layout, key=operator.itemgetter(2)):
+            cv2.polylines(frame, [item[1] for item in group], True, color, 2)
+        
+        for roi, pts, color, label, label_x, label_y, tw, th in layout:
+            # Draw label with background
+            cx, cy = roi_centers[roi.id]
             cv2.rectangle(frame, (label_x - 3, label_y - th - 3), 
                          (label_x + tw + 3, label_y + 3), (0, 0, 0), -1)
             cv2.putText(frame, label, (label_x, label_y),
@@ -434,21 +591,15 @@ class ROIManager:
                         cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
         
         # --- Draw Connection Lines ---
-        for roi in self.rois.values():
-            if roi.zone_type == "client" and roi.linked_employee_id:
-                # Find the linked employee zone
-                linked_id = roi.linked_employee_id
-                if roi.id in roi_centers and linked_id in roi_centers:
-                    pt1 = roi_centers[roi.id]
-                    pt2 = roi_centers[linked_id]
-                    # Draw dashed line (approximated with dotted segments)
-                    self._draw_dashed_line(frame, pt1, pt2, (0, 200, 255), 2, 10)
-                    # Draw arrow head
-                    self._draw_arrowhead(frame, pt1, pt2, (0, 200, 255))
+        for pt1, pt2 in links:
+            # Draw dashed line (approximated with dotted segments)
+            self._draw_dashed_line(frame, pt1, pt2, (0, 200, 255), 2, 10)
+            # Draw arrow head
+            self._draw_arrowhead(frame, pt1, pt2, (0, 200, 255))
         
-        # Blend overlay
+        # Blend overlay (in place, dirty region only)
         alpha = 0.3
-        frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
+        cv2.addWeighted(overlay, alpha, region, 1 - alpha, 0, dst=region)
         
         return frame
     
@@ -464,14 +615,15 @@ class ROIManager:
         dy = (y2 - y1) / dist
         
         num_dashes = int(dist / (dash_len * 2))
-        for i in range(num_dashes + 1):
-            start_d = i * dash_len * 2
-            end_d = min(start_d + dash_len, dist)
-            sx = int(x1 + dx * start_d)
-            sy = int(y1 + dy * start_d)
-            ex = int(x1 + dx * end_d)
-            ey = int(y1 + dy * end_d)
-            cv2.line(frame, (sx, sy), (ex, ey), color, thickness)
+        start_d = np.arange(num_dashes + 1) * (dash_len * 2)
+        end_d = np.minimum(start_d + dash_len, dist)
+        # (num_dashes + 1, 2 points, xy), truncated like int(); drawn in one call
+        dashes = np.empty((num_dashes + 1, 2, 2), np.float64)
+        dashes[:, 0, 0] = x1 + dx * start_d
+        dashes[:, 0, 1] = y1 + dy * start_d
+        dashes[:, 1, 0] = x1 + dx * end_d
+        dashes[:, 1, 1] = y1 + dy * end_d
+        cv2.polylines(frame, list(dashes.astype(np.int32)), False, color, thickness)
     
     @staticmethod
     def _draw_arrowhead(frame, pt1, pt2, color, size=15):
@@ -3,17 +3,18 @@ Video stream handler for RTSP cameras
 Supports multiple cameras
 """
 import cv2
-import sys
 import os
+import re
 import time
 import threading
-from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 from queue import Queue, Empty
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import CameraConfig, FRAME_WIDTH, FRAME_HEIGHT
+from config import CameraConfig, FRAME_WIDTH, FRAME_HEIGHT, RTSP_BACKEND, GST_DECODE
+
+# OpenCV builds without GStreamer can't open appsink pipelines
+_HAS_GSTREAMER = re.search(r"GStreamer:\s*YES", cv2.getBuildInformation()) is not None
 
 
 class StreamHandler:
@@ -95,6 +96,8 @@ class StreamHandler:
         try:
             if url.isdigit():
                 self.cap = cv2.VideoCapture(int(url))
+            elif RTSP_BACKEND == "gstreamer" and _HAS_GSTREAMER and self._open_gstreamer(url):
+                pass  # Hardware-decoded pipeline is open
             else:
                 # Use TCP transport (more stable) and set timeout
                 os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = "rtsp_transport;tcp" 
@@ -106,7 +109,10 @@ class StreamHandler:
                 
                 
             if self.cap.isOpened():
-                # self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # Not supported by all backends
+                # Keep the driver queue at one frame (V4L2/DSHOW webcams); backends
+                # without the property (FFmpeg/RTSP) just return False. RTSP stays
+                # fresh because _update() drains every frame into latest_frame.
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                 width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                 height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                 print(f"✅ [{self.camera_name}] Connected: {width}x{height}")
@@ -115,6 +121,30 @@ class StreamHandler:
         except Exception as e:
             print(f"❌ [{self.camera_name}] Connection error: {e}")
             
+    def _open_gstreamer(self, url: str) -> bool:
+        """Open url through a GStreamer decode pipeline; False to fall back to FFmpeg"""
+        # Quote the location: credentials may contain spaces, '!' or '"', which
+        # would otherwise end the property or start a new pipeline element
+        location = url.replace("\\", "\\\\").replace('"', '\\"')
+        # appsink keeps only the newest decoded frame (drop=true max-buffers=1)
+        pipeline = (
+            f'rtspsrc location="{location}" latency=200 protocols=tcp ! {GST_DECODE} ! '
+            "videoconvert ! video/x-raw,format=BGR ! appsink sync=false drop=true max-buffers=1"
+        )
+        try:
+            cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+        except cv2.error as e:
+            print(f"⚠️ [{self.camera_name}] GStreamer pipeline error ({e}), using FFmpeg")
+            return False
+        if cap.isOpened():
+            self.cap = cap
+            print(f"🎞️ [{self.camera_name}] GStreamer decode: {GST_DECODE}")
+            return True
+        cap.release()
+        print(f"⚠️ [{self.camera_name}] GStreamer pipeline failed to open "
+              f"(stream unreachable, or GST_DECODE '{GST_DECODE}' not available), using FFmpeg")
+        return False
+    
     def _reconnect(self):
         """Reconnect logic"""
         self.reconnect_attempts += 1
@@ -126,23 +156,33 @@ class StreamHandler:
         time.sleep(self.reconnect_delay)
         self._connect()
 
-    def read_frame(self):
-        """Read the latest frame from the buffer"""
+    def read_frame(self, copy: bool = True):
+        """
+        Read the latest frame from the buffer
+        
+        Args:
+            copy: False for read-only callers (e.g. inference). Published frames
+                are never modified in place — cap.read() allocates a new array
+                each time — so they may share it; callers that draw need a copy.
+        """
         from config import FRAME_WIDTH, FRAME_HEIGHT
         
         if not self.is_running:
             return False, None
             
+        # Hold the lock only to take the reference; resize/copy outside it so
+        # the capture thread is never blocked by a reader
         with self.lock:
-            if self.latest_frame is None:
-                return False, None
+            frame = self.latest_frame
+        
+        if frame is None:
+            return False, None
+        
+        # Resize if dimensions differ (Software Resolution Force)
+        if frame.shape[1] != FRAME_WIDTH or frame.shape[0] != FRAME_HEIGHT:
+            return True, cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
             
-            # Resize if dimensions differ (Software Resolution Force)
-            if self.latest_frame.shape[1] != FRAME_WIDTH or self.latest_frame.shape[0] != FRAME_HEIGHT:
-                resized = cv2.resize(self.latest_frame, (FRAME_WIDTH, FRAME_HEIGHT))
-                return True, resized
-                
-            return True, self.latest_frame.copy()
+        return True, frame.copy() if copy else frame
 
     def get_frame_size(self) -> tuple:
         if self.cap is None or not self.cap.isOpened():
@@ -11,15 +11,14 @@ import threading
 import random
 import requests
 import os
-import sys
-from pathlib import Path
 from typing import List, Dict
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from datetime import datetime
 from database.db import db
 from config import BASE_DIR
-from sqlalchemy import create_engine
+from sqlalchemy import (Date, DateTime, Integer, String, column, create_engine, func,
+                        insert, select, table, values)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import sessionmaker
 
 # --- Synchronization Configuration ---
@@ -37,6 +36,78 @@ MAX_BATCHES_PER_CYCLE = 5         # Rate limit: max batches per sync cycle
 BACKOFF_MULTIPLIER = 2.0          # Exponential growth factor
 JITTER_MAX = 5.0                  # Random jitter (seconds) to prevent thundering herd
 
+# Cloud tables, declared with just the columns the uploader writes
+_CLOUD_SESSIONS = table(
+    "sessions",
+    column("local_id"), column("branch_id"), column("place_id"), column("employee_id"),
+    column("start_time"), column("end_time"), column("duration_seconds"),
+    column("session_date"), column("is_synced"), column("is_checkpoint"), column("created_at"),
+)
+_CLOUD_CLIENT_VISITS = table(
+    "client_visits",
+    column("local_id"), column("branch_id"), column("place_id"), column("employee_id"),
+    column("track_id"), column("visit_date"), column("enter_time"), column("exit_time"),
+    column("duration_seconds"), column("is_synced"), column("is_checkpoint"), column("created_at"),
+)
+
+
+def _finished_upsert(cloud_table, *updated_columns):
+    """INSERT ... ON CONFLICT (branch_id, local_id) DO UPDATE for finished records.
+    SQLAlchemy only pages an ON CONFLICT insert into multi-row VALUES statements
+    (insertmanyvalues) when it has RETURNING — without it an executemany goes out
+    one row per statement. local_id is unique within a batch, so pages never conflict."""
+    stmt = pg_insert(cloud_table).values(is_synced=1, is_checkpoint=0, created_at=func.now())
+    set_ = {name: stmt.excluded[name] for name in updated_columns}
+    set_.update(is_synced=1, is_checkpoint=0)
+    return stmt.on_conflict_do_update(
+        index_elements=["branch_id", "local_id"], set_=set_
+    ).returning(cloud_table.c.local_id)
+
+
+_UPSERT_SESSIONS = _finished_upsert(_CLOUD_SESSIONS, "end_time", "duration_seconds")
+_UPSERT_CLIENT_VISITS = _finished_upsert(_CLOUD_CLIENT_VISITS, "exit_time", "duration_seconds")
+
+# Live checkpoints: never overwrite a row that was already finalized
+_upsert_checkpoint = pg_insert(_CLOUD_SESSIONS).values(
+    end_time=None, is_synced=1, is_checkpoint=1, created_at=func.now()
+)
+_UPSERT_CHECKPOINTS = _upsert_checkpoint.on_conflict_do_update(
+    index_elements=["branch_id", "local_id"],
+    set_={"duration_seconds": _upsert_checkpoint.excluded.duration_seconds, "is_checkpoint": 1},
+    where=_CLOUD_SESSIONS.c.is_checkpoint == 1,
+).returning(_CLOUD_SESSIONS.c.local_id)  # RETURNING: see _finished_upsert
+
+_CLOUD_CLIENT_CROSSINGS = table(
+    "client_crossings",
+    column("branch_id"), column("branch_name"), column("camera_name"), column("track_id"),
+    column("crossed_at"), column("log_date"), column("created_at"),
+)
+_CROSSING_COLUMNS = ("branch_id", "branch_name", "camera_name", "track_id", "crossed_at", "log_date")
+
+
+def _insert_new_crossings(rows: List[tuple]):
+    """INSERT ... SELECT DISTINCT FROM (VALUES ...) WHERE NOT EXISTS for one batch.
+    The cloud table has no unique key to target with ON CONFLICT, so duplicates are
+    still skipped with NOT EXISTS — but as one statement instead of one per row."""
+    new = values(
+        column("branch_id", String), column("branch_name", String),
+        column("camera_name", String), column("track_id", Integer),
+        column("crossed_at", DateTime), column("log_date", Date),
+        name="new_crossings",
+    ).data(rows)
+    cloud = _CLOUD_CLIENT_CROSSINGS.c
+    already_sent = select(1).where(
+        cloud.branch_id == new.c.branch_id,
+        cloud.camera_name == new.c.camera_name,
+        cloud.track_id == new.c.track_id,
+        cloud.crossed_at == new.c.crossed_at,
+    ).exists()
+    return insert(_CLOUD_CLIENT_CROSSINGS).from_select(
+        _CROSSING_COLUMNS + ("created_at",),
+        select(*(new.c[name] for name in _CROSSING_COLUMNS), func.now())
+        .distinct().where(~already_sent),
+    )
+
 
 class CloudSyncService:
     """
@@ -131,6 +202,9 @@ class CloudSyncService:
                 self._last_checkpoint_sync = now
                 
             time.sleep(1.0)  # Check every second
+        
+        # Release this thread's local DB session
+        db.close_thread_session()
     
     # --- Backoff Logic ---
     
@@ -168,10 +242,7 @@ class CloudSyncService:
     def _send_sync_status(self):
         """Send detailed status report to cloud API"""
         # Count unsynced items
-        unsynced_sessions = len(db.get_unsynced_sessions(limit=1000))
-        unsynced_visits = len(db.get_unsynced_client_visits(limit=1000))
-        unsynced_crossings = len(db.get_unsynced_client_crossings(limit=1000))
-        total_unsynced = unsynced_sessions + unsynced_visits + unsynced_crossings
+        total_unsynced = db.count_unsynced()
         
         payload = {
             "branch_id": BRANCH_ID,
@@ -240,21 +311,15 @@ class CloudSyncService:
     def _sync_data(self):
         """Upload pending records with rate limiting"""
         if self.mock_mode:
-            # In mock mode: still mark as synced for testing
+            # In mock mode: still mark as synced for testing (single commit)
             sessions_data = db.get_unsynced_sessions(limit=BATCH_SIZE)
-            if sessions_data:
-                ids = [r['id'] for r in sessions_data]
-                db.mark_as_synced("session", ids)
-            
             visits_data = db.get_unsynced_client_visits(limit=BATCH_SIZE)
-            if visits_data:
-                ids = [r['id'] for r in visits_data]
-                db.mark_as_synced("client_visit", ids)
-                
             crossings_data = db.get_unsynced_client_crossings(limit=BATCH_SIZE)
-            if crossings_data:
-                ids = [r['id'] for r in crossings_data]
-                db.mark_as_synced("client_crossing", ids)
+            db.mark_many_as_synced(
+                [r['id'] for r in sessions_data],
+                [r['id'] for r in visits_data],
+                [r['id'] for r in crossings_data]
+            )
             return True
         
         batches_processed = 0
@@ -327,98 +392,61 @@ class CloudSyncService:
             return False
             
         try:
-            from sqlalchemy import text
+            if data_type == "session":
+                sql = _UPSERT_SESSIONS
+                params = [{
+                    "local_id": r['id'],
+                    "branch_id": BRANCH_ID,
+                    "place_id": r['place_id'],
+                    "employee_id": r['employee_id'],
+                    "start_time": datetime.fromisoformat(r['start_time']),
+                    "end_time": (datetime.fromisoformat(r['end_time'])
+                                if r['end_time'] else None),
+                    "duration_seconds": r['duration_seconds'],
+                    "session_date": datetime.fromisoformat(
+                        r['start_time']).date(),
+                } for r in records]
+                
+            elif data_type == "client_visit":
+                sql = _UPSERT_CLIENT_VISITS
+                params = [{
+                    "local_id": r['id'],
+                    "branch_id": BRANCH_ID,
+                    "place_id": r['place_id'],
+                    "employee_id": r['employee_id'],
+                    "track_id": r['track_id'],
+                    "visit_date": datetime.fromisoformat(
+                        r['enter_time']).date(),
+                    "enter_time": datetime.fromisoformat(r['enter_time']),
+                    "exit_time": (datetime.fromisoformat(r['exit_time'])
+                                 if r['exit_time'] else None),
+                    "duration_seconds": r['duration_seconds'],
+                } for r in records]
+                
+            elif data_type == "client_crossing":
+                # Camera name for backward compatibility with front-end (one lookup per camera)
+                camera_names = {}
+                for camera_id in {r['camera_id'] for r in records}:
+                    camera = db.get_camera_by_id(camera_id)
+                    camera_names[camera_id] = camera.name if camera else "Unknown Camera"
+                
+                sql = _insert_new_crossings([(
+                    str(BRANCH_ID),  # String matching client-counter
+                    BRANCH_NAME,
+                    camera_names[r['camera_id']],  # Using name instead of id
+                    r['track_id'],
+                    datetime.fromisoformat(r['crossed_at']),
+                    datetime.fromisoformat(r['log_date']).date(),
+                ) for r in records]) if records else None
+                params = None  # Rows are part of the statement
+                
+            else:
+                sql, params = None, None
             
+            # One statement for the whole batch (multi-row VALUES), one commit
             with cloud_session:
-                for r in records:
-                    if data_type == "session":
-                        cloud_session.execute(text("""
-                            INSERT INTO sessions 
-                                (local_id, branch_id, place_id, employee_id,
-                                 start_time, end_time, duration_seconds,
-                                 session_date, is_synced, is_checkpoint, created_at)
-                            VALUES 
-                                (:local_id, :branch_id, :place_id, :employee_id,
-                                 :start_time, :end_time, :duration_seconds,
-                                 :session_date, 1, 0, NOW())
-                            ON CONFLICT (branch_id, local_id) DO UPDATE SET
-                                end_time = EXCLUDED.end_time,
-                                duration_seconds = EXCLUDED.duration_seconds,
-                                is_synced = 1,
-                                is_checkpoint = 0
-                        """), {
-                            "local_id": r['id'],
-                            "branch_id": BRANCH_ID,
-                            "place_id": r['place_id'],
-                            "employee_id": r['employee_id'],
-                            "start_time": datetime.fromisoformat(r['start_time']),
-                            "end_time": (datetime.fromisoformat(r['end_time'])
-                                        if r['end_time'] else None),
-                            "duration_seconds": r['duration_seconds'],
-                            "session_date": datetime.fromisoformat(
-                                r['start_time']).date(),
-                        })
-                        
-                    elif data_type == "client_visit":
-                        cloud_session.execute(text("""
-                            INSERT INTO client_visits
-                                (local_id, branch_id, place_id, employee_id,
-                                 track_id, visit_date, enter_time, exit_time,
-                                 duration_seconds, is_synced, is_checkpoint, created_at)
-                            VALUES
-                                (:local_id, :branch_id, :place_id, :employee_id,
-                                 :track_id, :visit_date, :enter_time, :exit_time,
-                                 :duration_seconds, 1, 0, NOW())
-                            ON CONFLICT (branch_id, local_id) DO UPDATE SET
-                                exit_time = EXCLUDED.exit_time,
-                                duration_seconds = EXCLUDED.duration_seconds,
-                                is_synced = 1,
-                                is_checkpoint = 0
-                        """), {
-                            "local_id": r['id'],
-                            "branch_id": BRANCH_ID,
-                            "place_id": r['place_id'],
-                            "employee_id": r['employee_id'],
-                            "track_id": r['track_id'],
-                            "visit_date": datetime.fromisoformat(
-                                r['enter_time']).date(),
-                            "enter_time": datetime.fromisoformat(r['enter_time']),
-                            "exit_time": (datetime.fromisoformat(r['exit_time'])
-                                         if r['exit_time'] else None),
-                            "duration_seconds": r['duration_seconds'],
-                        })
-                        
-                    elif data_type == "client_crossing":
-                        # Fetch camera name for backward compatibility with front-end
-                        camera_name = "Unknown Camera"
-                        camera = db.get_camera_by_id(r['camera_id'])
-                        if camera:
-                            camera_name = camera.name
-
-                        cloud_session.execute(text("""
-                            INSERT INTO client_crossings
-                                (branch_id, branch_name, camera_name, track_id,
-                                 crossed_at, log_date, created_at)
-                            SELECT 
-                                :branch_id, :branch_name, :camera_name, :track_id,
-                                :crossed_at, :log_date, NOW()
-                            WHERE NOT EXISTS (
-                                SELECT 1 FROM client_crossings 
-                                WHERE branch_id = :branch_id 
-                                  AND camera_name = :camera_name 
-                                  AND track_id = :track_id 
-                                  AND crossed_at = :crossed_at
-                            )
-                        """), {
-                            "local_id": r['id'],
-                            "branch_id": str(BRANCH_ID),  # String matching client-counter
-                            "branch_name": BRANCH_NAME,
-                            "camera_name": camera_name,   # Using name instead of id
-                            "track_id": r['track_id'],
-                            "crossed_at": datetime.fromisoformat(r['crossed_at']),
-                            "log_date": datetime.fromisoformat(r['log_date']).date(),
-                        })
-                
+                if records and sql is not None:
+                    cloud_session.execute(sql, params)
                 cloud_session.commit()
             return True
             
@@ -453,38 +481,25 @@ class CloudSyncService:
             return
         
         try:
-            from sqlalchemy import text
             from config import tashkent_now
             
             now = tashkent_now()
             
+            params = []
+            for r in checkpoints:
+                start_time = datetime.fromisoformat(r['start_time'])
+                params.append({
+                    "local_id": r['id'],
+                    "branch_id": BRANCH_ID,
+                    "place_id": r['place_id'],
+                    "employee_id": r['employee_id'],
+                    "start_time": start_time,
+                    "duration_seconds": (now - start_time).total_seconds(),
+                    "session_date": start_time.date(),
+                })
+            
             with cloud_session:
-                for r in checkpoints:
-                    start_time = datetime.fromisoformat(r['start_time'])
-                    duration = (now - start_time).total_seconds()
-                    
-                    cloud_session.execute(text("""
-                        INSERT INTO sessions 
-                            (local_id, branch_id, place_id, employee_id,
-                             start_time, end_time, duration_seconds,
-                             session_date, is_synced, is_checkpoint, created_at)
-                        VALUES 
-                            (:local_id, :branch_id, :place_id, :employee_id,
-                             :start_time, NULL, :duration_seconds,
-                             :session_date, 1, 1, NOW())
-                        ON CONFLICT (branch_id, local_id) DO UPDATE SET
-                            duration_seconds = EXCLUDED.duration_seconds,
-                            is_checkpoint = 1
-                        WHERE sessions.is_checkpoint = 1
-                    """), {
-                        "local_id": r['id'],
-                        "branch_id": BRANCH_ID,
-                        "place_id": r['place_id'],
-                        "employee_id": r['employee_id'],
-                        "start_time": start_time,
-                        "duration_seconds": duration,
-                        "session_date": start_time.date(),
-                    })
+                cloud_session.execute(_UPSERT_CHECKPOINTS, params)
                 
                 cloud_session.commit()
             print(f"[SyncV2] 🔄 {len(checkpoints)} active checkpoint(s) synced")
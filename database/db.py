@@ -2,19 +2,112 @@
 Database connection and utilities
 Supports multiple cameras
 """
-import sys
-from pathlib import Path
+import threading
 from datetime import date, datetime
 from typing import List, Optional
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session as DBSession
+from sqlalchemy import bindparam, create_engine, delete, event, false, insert, lambda_stmt, select, true, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, scoped_session, Session as DBSession
 from database.models import Base, Camera, Place, Session, Employee, ClientVisit, ClientCrossing
 from config import DATABASE_PATH, DATABASE_DIR, CameraConfig, tashkent_now
 
 
+# Hot aggregate queries — executed as raw DB-API SQL to skip ORM row building
+_SQL_TOTAL_TIME_FOR_PLACE = (
+    "SELECT SUM(duration_seconds) FROM sessions "
+    "WHERE place_id = ? AND session_date = ?"
+)
+_SQL_TOTAL_TIME_FOR_EMPLOYEE = (
+    "SELECT SUM(duration_seconds) FROM sessions "
+    "WHERE employee_id = ? AND session_date = ?"
+)
+_SQL_CLIENT_STATS_FOR_EMPLOYEE = (
+    "SELECT COUNT(id), SUM(duration_seconds) FROM client_visits "
+    "WHERE employee_id = ? AND visit_date = ?"
+)
+_SQL_CLIENT_STATS_FOR_PLACE = (
+    "SELECT COUNT(id), SUM(duration_seconds) FROM client_visits "
+    "WHERE place_id = ? AND visit_date = ?"
+)
+# Per-place overlay stats for one camera in a single pass. Totals follow the
+# assigned employee across all zones, or the place itself when unassigned;
+# correlated subqueries avoid the sessions x client_visits row explosion.
+_SQL_PLACE_STATS_FOR_CAMERA = (
+    "SELECT p.id, e.id, e.name, "
+    "CASE WHEN e.id IS NULL "
+    "THEN (SELECT SUM(duration_seconds) FROM sessions WHERE place_id = p.id AND session_date = :day) "
+    "ELSE (SELECT SUM(duration_seconds) FROM sessions WHERE employee_id = e.id AND session_date = :day) END, "
+    "CASE WHEN e.id IS NULL "
+    "THEN (SELECT COUNT(id) FROM client_visits WHERE place_id = p.id AND visit_date = :day) "
+    "ELSE (SELECT COUNT(id) FROM client_visits WHERE employee_id = e.id AND visit_date = :day) END, "
+    "CASE WHEN e.id IS NULL "
+    "THEN (SELECT SUM(duration_seconds) FROM client_visits WHERE place_id = p.id AND visit_date = :day) "
+    "ELSE (SELECT SUM(duration_seconds) FROM client_visits WHERE employee_id = e.id AND visit_date = :day) END "
+    "FROM places p LEFT JOIN employees e ON e.id = p.employee_id "
+    "WHERE p.camera_id = :camera_id"
+)
+# Pending upload backlog, answered from the partial ix_*_unsynced indexes
+_SQL_UNSYNCED_COUNT = (
+    "SELECT (SELECT COUNT(*) FROM sessions WHERE is_synced = 0 AND is_checkpoint = 0)"
+    " + (SELECT COUNT(*) FROM client_visits WHERE is_synced = 0 AND is_checkpoint = 0)"
+    " + (SELECT COUNT(*) FROM client_crossings WHERE is_synced = 0)"
+)
+# Smallest id such that id-1 is taken (or is the 0 sentinel) and id is free
+_SQL_NEXT_FREE_PLACE_ID = (
+    "SELECT COALESCE(MIN(t.id + 1), 1) "
+    "FROM (SELECT id FROM places UNION SELECT 0) t "
+    "WHERE NOT EXISTS (SELECT 1 FROM places p WHERE p.id = t.id + 1)"
+)
+
+# Sync flag updates; the expanding IN keeps one cached plan for any batch size
+_SYNC_MODELS = {
+    "session": Session,
+    "client_visit": ClientVisit,
+    "client_crossing": ClientCrossing,
+}
+_MARK_SYNCED = {
+    table_type: update(model)
+    .where(model.id.in_(bindparam("ids", expanding=True)))
+    .values(is_synced=True)
+    .execution_options(synchronize_session=False)
+    for table_type, model in _SYNC_MODELS.items()
+}
+
+# Frequent getters — lambda_stmt caches the built statement, only params change
+_Q_CAMERA_BY_EXTERNAL_ID = lambda_stmt(
+    lambda: select(Camera).where(Camera.external_id == bindparam("external_id"))
+)
+_Q_CAMERA_BY_ID = lambda_stmt(
+    lambda: select(Camera).where(Camera.id == bindparam("camera_id"))
+)
+_Q_EMPLOYEE_BY_PLACE = lambda_stmt(
+    lambda: select(Employee)
+    .join(Place, Place.employee_id == Employee.id)
+    .where(Place.id == bindparam("place_id"))
+)
+_Q_SESSIONS_FOR_DATE = lambda_stmt(
+    lambda: select(
+        Session.id,
+        Session.place_id,
+        Session.start_time,
+        Session.end_time,
+        Session.duration_seconds
+    ).where(Session.session_date == bindparam("target_date"))
+)
+
+
+def _sqlite_pragmas(dbapi_conn, _connection_record):
+    """Per-connection SQLite tuning: WAL lets the GUI read while the sync worker writes"""
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")   # fsync at checkpoints, not every commit
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-65536")    # 64 MB
+    cursor.close()
+
+
 class Database:
     """SQLite database manager"""
     
@@ -22,88 +115,91 @@ class Database:
         # Ensure database directory exists
         DATABASE_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Create engine
+        # Create engine (file databases get SQLAlchemy's default QueuePool)
         self.engine = create_engine(
             f"sqlite:///{DATABASE_PATH}",
             echo=False,
-            connect_args={"check_same_thread": False}
+            connect_args={"check_same_thread": False},
+            query_cache_size=1200,  # room for the camera, sync and GUI statement variants
         )
+        event.listen(self.engine, "connect", _sqlite_pragmas)
         
         # Create tables
         Base.metadata.create_all(self.engine)
         
         # Auto-migrate: check for new columns
-        from database.migrator import update_schema
+        from database.migrator import update_schema, ensure_indexes
         try:
             update_schema(self.engine, Base)
+            ensure_indexes(self.engine, Base)
         except Exception as e:
             print(f"[WARN] Auto-migration failed: {e}")
         
-        # Session factory
-        self.SessionLocal = sessionmaker(bind=self.engine)
+        # Session factory: one reusable session per thread.
+        # expire_on_commit=False keeps returned objects readable after commit/close
+        self.SessionLocal = scoped_session(
+            sessionmaker(bind=self.engine, expire_on_commit=False)
+        )
+        
+        # Checkpoint heartbeats are coalesced here and written by flush_checkpoints()
+        # {record_id: (end_time, duration_seconds)}
+        self._pending_session_checkpoints = {}
+        self._pending_visit_checkpoints = {}
+        self._checkpoint_lock = threading.Lock()
         
         # Finalize any stale checkpoints from previous crash/power outage
         self.finalize_stale_checkpoints()
     
     def get_session(self) -> DBSession:
-        """Get database session"""
+        """Get the calling thread's database session"""
         return self.SessionLocal()
     
+    def close_thread_session(self):
+        """Release the calling thread's session (call on worker thread teardown)"""
+        self.SessionLocal.remove()
+    
+    def _first_row(self, sql: str, *params) -> tuple:
+        """Execute a raw SELECT and return its first row (no ORM involved)"""
+        with self.engine.connect() as conn:
+            return conn.exec_driver_sql(sql, params).fetchone()
+    
+    def _scalar(self, sql: str, *params):
+        """Execute a raw single-value SELECT and return the value"""
+        return self._first_row(sql, *params)[0]
+    
     # ============ Camera Operations ============
     
     def get_or_create_camera(self, config: CameraConfig) -> Camera:
         """Get existing camera or create new one"""
-        with self.get_session() as session:
-            camera = session.query(Camera).filter(
-                Camera.external_id == config.id
-            ).first()
-            
-            if camera:
-                # Update if changed
-                camera.name = config.name
-                camera.rtsp_url = config.url
-                session.commit()
-            else:
-                # Create new
-                camera = Camera(
-                    external_id=config.id,
-                    name=config.name,
-                    rtsp_url=config.url
-                )
-                session.add(camera)
-                session.commit()
-                session.refresh(camera)
-            
-            # Extract values before session closes to avoid DetachedInstanceError
-            camera_id = camera.id
-            camera_external_id = camera.external_id
-            camera_name = camera.name
-            camera_rtsp_url = camera.rtsp_url
-        
-        # Return a new detached Camera with extracted values
-        detached_camera = Camera(
-            id=camera_id,
-            external_id=camera_external_id,
-            name=camera_name,
-            rtsp_url=camera_rtsp_url
+        # Single atomic upsert (SQLite >= 3.35 supports RETURNING)
+        stmt = sqlite_insert(Camera).values(
+            external_id=config.id,
+            name=config.name,
+            rtsp_url=config.url
         )
-        # Manually set the id since it's normally auto-generated
-        detached_camera.id = camera_id
-        return detached_camera
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Camera.external_id],
+            set_={"name": stmt.excluded.name, "rtsp_url": stmt.excluded.rtsp_url}
+        ).returning(Camera)
+        
+        with self.get_session() as session:
+            camera = session.execute(stmt).scalar_one()
+            session.commit()
+        return camera
     
     def get_camera_by_external_id(self, external_id: int) -> Optional[Camera]:
         """Get camera by external ID"""
         with self.get_session() as session:
-            return session.query(Camera).filter(
-                Camera.external_id == external_id
-            ).first()
+            return session.execute(
+                _Q_CAMERA_BY_EXTERNAL_ID, {"external_id": external_id}
+            ).scalars().first()
 
     def get_camera_by_id(self, camera_id: int) -> Optional[Camera]:
         """Get camera by internal ID"""
         with self.get_session() as session:
-            return session.query(Camera).filter(
-                Camera.id == camera_id
-            ).first()
+            return session.execute(
+                _Q_CAMERA_BY_ID, {"camera_id": camera_id}
+            ).scalars().first()
     
     # ============ Place Operations ============
     
@@ -122,7 +218,6 @@ class Database:
             )
             session.add(place)
             session.commit()
-            session.refresh(place)
             return place
     
     def save_place_with_id(self, place_id: int, camera_id: int, name: str, 
@@ -130,30 +225,25 @@ class Database:
                            linked_employee_id: int = None, 
                            employee_id: int = None) -> Place:
         """Save a place with a FORCED ID (for fixed numbering)"""
-        import json as json_lib
-        from sqlalchemy import text
+        # Ensure coordinates are JSON-serializable lists (not tuples);
+        # the JSON column type handles serialization itself
+        clean_coords = [[int(x), int(y)] for x, y in roi_coordinates]
+        
+        # Explicit id in the INSERT forces the specific ID
+        stmt = insert(Place).values(
+            id=place_id,
+            camera_id=camera_id,
+            name=name,
+            roi_coordinates=clean_coords,
+            zone_type=zone_type,
+            linked_employee_id=linked_employee_id,
+            employee_id=employee_id,
+            status="VACANT"
+        ).returning(Place)
+        
         with self.get_session() as session:
-            # Ensure coordinates are JSON-serializable lists (not tuples)
-            clean_coords = [[int(x), int(y)] for x, y in roi_coordinates]
-            
-            # Use raw INSERT to force specific ID
-            session.execute(text(
-                "INSERT INTO places (id, camera_id, name, roi_coordinates, zone_type, "
-                "linked_employee_id, employee_id, status, created_at, updated_at) "
-                "VALUES (:id, :camera_id, :name, :roi_coords, :zone_type, "
-                ":linked_emp_id, :emp_id, 'VACANT', datetime('now'), datetime('now'))"
-            ), {
-                "id": place_id,
-                "camera_id": camera_id,
-                "name": name,
-                "roi_coords": json_lib.dumps(clean_coords),
-                "zone_type": zone_type,
-                "linked_emp_id": linked_employee_id,
-                "emp_id": employee_id
-            })
+            place = session.execute(stmt).scalar_one()
             session.commit()
-            # Retrieve the created object
-            place = session.query(Place).filter(Place.id == place_id).first()
             return place
     
     def get_next_zone_id(self) -> int:
@@ -163,73 +253,54 @@ class Database:
         If IDs are [1,2,3] → returns 4 (next sequential).
         If no zones exist → returns 1.
         """
-        with self.get_session() as session:
-            existing_ids = sorted([
-                p.id for p in session.query(Place.id).all()
-            ])
-            
-            if not existing_ids:
-                return 1
-            
-            # Find first gap
-            for expected_id in range(1, existing_ids[-1] + 1):
-                if expected_id not in existing_ids:
-                    return expected_id
-            
-            # No gaps — return next after max
-            return existing_ids[-1] + 1
+        return self._scalar(_SQL_NEXT_FREE_PLACE_ID)
     
     def delete_all_places(self) -> int:
         """Delete ALL places across all cameras, returns count deleted"""
         with self.get_session() as session:
-            count = session.query(Place).delete()
+            result = session.execute(delete(Place))
             session.commit()
-            return count
+            return result.rowcount
     
     def get_places_for_camera(self, camera_id: int) -> List[dict]:
         """Get all places for a specific camera"""
-        with self.get_session() as session:
-            places = session.query(Place).filter(
-                Place.camera_id == camera_id
-            ).all()
-            return [
-                {
-                    "id": p.id,
-                    "camera_id": p.camera_id,
-                    "name": p.name,
-                    "roi_coordinates": p.roi_coordinates,
-                    "status": p.status,
-                    "zone_type": p.zone_type,
-                    "employee_id": p.employee_id,
-                    "linked_employee_id": p.linked_employee_id
-                }
-                for p in places
-            ]
+        stmt = select(
+            Place.id,
+            Place.camera_id,
+            Place.name,
+            Place.roi_coordinates,
+            Place.status,
+            Place.zone_type,
+            Place.employee_id,
+            Place.linked_employee_id
+        ).where(Place.camera_id == camera_id)
+        with self.get_session() as session:
+            return [dict(row) for row in session.execute(stmt).mappings()]
     
     def get_all_places(self) -> List[dict]:
         """Get all places"""
+        stmt = select(
+            Place.id,
+            Place.camera_id,
+            Place.name,
+            Place.roi_coordinates,
+            Place.status
+        )
         with self.get_session() as session:
-            places = session.query(Place).all()
-            return [
-                {
-                    "id": p.id,
-                    "camera_id": p.camera_id,
-                    "name": p.name,
-                    "roi_coordinates": p.roi_coordinates,
-                    "status": p.status
-                }
-                for p in places
-            ]
+            return [dict(row) for row in session.execute(stmt).mappings()]
     
     def delete_place(self, place_id: int) -> bool:
         """Delete a place by ID"""
         with self.get_session() as session:
-            place = session.query(Place).filter(Place.id == place_id).first()
-            if place:
-                session.delete(place)
-                session.commit()
-                return True
-            return False
+            # Detach history from the zone (same as the ORM delete did;
+            # SQLite does not enforce ON DELETE SET NULL without the FK pragma)
+            for model in (Session, ClientVisit):
+                session.execute(
+                    update(model).where(model.place_id == place_id).values(place_id=None)
+                )
+            result = session.execute(delete(Place).where(Place.id == place_id))
+            session.commit()
+            return result.rowcount > 0
     
     def delete_places_for_camera(self, camera_id: int) -> int:
         """Delete all places for a camera, returns count deleted"""
@@ -260,7 +331,6 @@ class Database:
                      zone_type: str = "employee", linked_employee_id: int = None,
                      employee_id: int = None) -> bool:
         """Update an existing place with new data (coordinates, name, type, links)"""
-        import json as json_lib
         with self.get_session() as session:
             place = session.query(Place).filter(Place.id == place_id).first()
             if not place:
@@ -268,7 +338,7 @@ class Database:
             
             clean_coords = [[int(x), int(y)] for x, y in roi_coordinates]
             place.name = name
-            place.roi_coordinates = json_lib.dumps(clean_coords)
+            place.roi_coordinates = clean_coords
             place.zone_type = zone_type
             place.linked_employee_id = linked_employee_id
             place.employee_id = employee_id
@@ -281,94 +351,69 @@ class Database:
                      end_time: datetime, duration_seconds: float,
                      employee_id: int = None) -> Session:
         """Save a work session, linked directly to employee"""
-        with self.get_session() as session:
-            work_session = Session(
-                place_id=place_id,
-                employee_id=employee_id,
-                start_time=start_time,
-                end_time=end_time,
-                duration_seconds=duration_seconds,
-                session_date=date.today()
-            )
-            session.add(work_session)
+        stmt = insert(Session).values(
+            place_id=place_id,
+            employee_id=employee_id,
+            start_time=start_time,
+            end_time=end_time,
+            duration_seconds=duration_seconds,
+            session_date=date.today()
+        ).returning(Session)
+        with self.get_session() as session:
+            work_session = session.execute(stmt).scalar_one()
             session.commit()
-            session.refresh(work_session)
             return work_session
     
     def get_sessions_for_date(self, target_date: date) -> List[dict]:
         """Get all sessions for a specific date"""
         with self.get_session() as session:
-            sessions = session.query(Session).filter(
-                Session.session_date == target_date
-            ).all()
-            return [
-                {
-                    "id": s.id,
-                    "place_id": s.place_id,
-                    "start_time": s.start_time,
-                    "end_time": s.end_time,
-                    "duration_seconds": s.duration_seconds
-                }
-                for s in sessions
-            ]
+            rows = session.execute(_Q_SESSIONS_FOR_DATE, {"target_date": target_date})
+            return [dict(row) for row in rows.mappings()]
     
     def get_sessions_for_camera(self, camera_id: int, target_date: date = None) -> List[dict]:
         """Get sessions for all places of a camera"""
         with self.get_session() as session:
-            query = session.query(Session).join(Place).filter(
+            stmt = select(
+                Session.id,
+                Session.place_id,
+                Session.start_time,
+                Session.end_time,
+                Session.duration_seconds
+            ).join(Place, Session.place_id == Place.id).where(
                 Place.camera_id == camera_id
             )
             if target_date:
-                query = query.filter(Session.session_date == target_date)
+                stmt = stmt.where(Session.session_date == target_date)
             
-            sessions = query.all()
-            return [
-                {
-                    "id": s.id,
-                    "place_id": s.place_id,
-                    "start_time": s.start_time,
-                    "end_time": s.end_time,
-                    "duration_seconds": s.duration_seconds
-                }
-                for s in sessions
-            ]
+            # Plain column rows — no Session ORM objects are built
+            return [dict(row) for row in session.execute(stmt).mappings()]
             
     def get_total_time_for_day(self, place_id: int, target_date: date) -> float:
         """Get total duration for a place on a specific date"""
-        from sqlalchemy import func
-        with self.get_session() as session:
-            total = session.query(func.sum(Session.duration_seconds)).filter(
-                Session.place_id == place_id,
-                Session.session_date == target_date
-            ).scalar()
-            return total if total else 0.0
+        total = self._scalar(_SQL_TOTAL_TIME_FOR_PLACE,
+                             place_id, target_date.isoformat())
+        return total if total else 0.0
     
     def get_total_time_for_employee_day(self, employee_id: int, target_date: date) -> float:
         """Get total duration for an employee on a specific date (across ALL zones)"""
-        from sqlalchemy import func
-        with self.get_session() as session:
-            total = session.query(func.sum(Session.duration_seconds)).filter(
-                Session.employee_id == employee_id,
-                Session.session_date == target_date
-            ).scalar()
-            return total if total else 0.0
+        total = self._scalar(_SQL_TOTAL_TIME_FOR_EMPLOYEE,
+                             employee_id, target_date.isoformat())
+        return total if total else 0.0
     
     # ============ Employee Operations ============
     
     def get_employee_by_place(self, place_id: int) -> Optional[dict]:
         """Get employee assigned to a place/zone"""
         with self.get_session() as session:
-            place = session.query(Place).filter(Place.id == place_id).first()
-            if place and place.employee_id:
-                employee = session.query(Employee).filter(
-                    Employee.id == place.employee_id
-                ).first()
-                if employee:
-                    return {
-                        'id': employee.id,
-                        'name': employee.name,
-                        'position': employee.position
-                    }
+            employee = session.execute(
+                _Q_EMPLOYEE_BY_PLACE, {"place_id": place_id}
+            ).scalars().first()
+            if employee:
+                return {
+                    'id': employee.id,
+                    'name': employee.name,
+                    'position': employee.position
+                }
             return None
     
     def get_all_employees(self) -> List[dict]:
@@ -404,168 +449,196 @@ class Database:
                           enter_time: datetime, exit_time: datetime, 
                           duration_seconds: float) -> int:
         """Save a completed client visit"""
-        with self.get_session() as session:
-            visit = ClientVisit(
-                place_id=place_id,
-                employee_id=employee_id,
-                track_id=track_id,
-                visit_date=enter_time.date(),
-                enter_time=enter_time,
-                exit_time=exit_time,
-                duration_seconds=duration_seconds
-            )
-            session.add(visit)
+        stmt = insert(ClientVisit).values(
+            place_id=place_id,
+            employee_id=employee_id,
+            track_id=track_id,
+            visit_date=enter_time.date(),
+            enter_time=enter_time,
+            exit_time=exit_time,
+            duration_seconds=duration_seconds
+        ).returning(ClientVisit.id)
+        with self.get_session() as session:
+            visit_id = session.execute(stmt).scalar_one()
             session.commit()
-            return visit.id
+            return visit_id
     
     def get_client_stats_for_employee(self, employee_id: int, target_date: date) -> dict:
         """Get client statistics for an employee on a specific date"""
-        from sqlalchemy import func
-        with self.get_session() as session:
-            # Count clients
-            client_count = session.query(func.count(ClientVisit.id)).filter(
-                ClientVisit.employee_id == employee_id,
-                ClientVisit.visit_date == target_date
-            ).scalar() or 0
-            
-            # Total service time
-            total_time = session.query(func.sum(ClientVisit.duration_seconds)).filter(
-                ClientVisit.employee_id == employee_id,
-                ClientVisit.visit_date == target_date
-            ).scalar() or 0.0
-            
-            return {
-                'client_count': client_count,
-                'total_service_time': total_time
-            }
-    
+        client_count, total_time = self._first_row(
+            _SQL_CLIENT_STATS_FOR_EMPLOYEE, employee_id, target_date.isoformat()
+        )
+        return {
+            'client_count': client_count or 0,
+            'total_service_time': total_time or 0.0
+        }
 
     def get_client_stats_for_place(self, place_id: int, target_date: date) -> dict:
         """Get client statistics for a place on a specific date"""
-        from sqlalchemy import func
-        with self.get_session() as session:
-            # Count clients
-            client_count = session.query(func.count(ClientVisit.id)).filter(
-                ClientVisit.place_id == place_id,
-                ClientVisit.visit_date == target_date
-            ).scalar() or 0
-            
-            # Total service time
-            total_time = session.query(func.sum(ClientVisit.duration_seconds)).filter(
-                ClientVisit.place_id == place_id,
-                ClientVisit.visit_date == target_date
-            ).scalar() or 0.0
-            
-            return {
-                'client_count': client_count,
-                'total_service_time': total_time
+        client_count, total_time = self._first_row(
+            _SQL_CLIENT_STATS_FOR_PLACE, place_id, target_date.isoformat()
+        )
+        return {
+            'client_count': client_count or 0,
+            'total_service_time': total_time or 0.0
+        }
+
+    def get_place_stats_for_camera(self, camera_id: int, target_date: date) -> dict:
+        """Get {place_id: stats dict} for every place of a camera in one query"""
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                _SQL_PLACE_STATS_FOR_CAMERA,
+                {"camera_id": camera_id, "day": target_date.isoformat()}
+            ).fetchall()
+        return {
+            place_id: {
+                'employee_id': employee_id,
+                'employee_name': employee_name,
+                'work_time': work_time or 0.0,
+                'client_count': client_count or 0,
+                'total_service_time': service_time or 0.0
             }
+            for place_id, employee_id, employee_name, work_time, client_count, service_time in rows
+        }
 
     # ============ Checkpoint Operations ============
 
     def save_session_checkpoint(self, place_id: int, employee_id: int,
                                  start_time: datetime) -> int:
-        """Create a checkpoint session record (is_checkpoint=1)"""
-        with self.get_session() as session:
-            work_session = Session(
-                place_id=place_id,
-                employee_id=employee_id,
-                start_time=start_time,
-                end_time=tashkent_now(),
-                duration_seconds=0.0,
-                session_date=start_time.date(),
-                is_checkpoint=1
-            )
-            session.add(work_session)
+        """Create a checkpoint session record (is_checkpoint=True)"""
+        stmt = insert(Session).values(
+            place_id=place_id,
+            employee_id=employee_id,
+            start_time=start_time,
+            end_time=tashkent_now(),
+            duration_seconds=0.0,
+            session_date=start_time.date(),
+            is_checkpoint=True
+        ).returning(Session.id)
+        with self.get_session() as session:
+            session_id = session.execute(stmt).scalar_one()
             session.commit()
-            session.refresh(work_session)
-            print(f"💾 Checkpoint created: Session #{work_session.id} (Zone {place_id})")
-            return work_session.id
+            print(f"💾 Checkpoint created: Session #{session_id} (Zone {place_id})")
+            return session_id
 
     def update_session_checkpoint(self, session_id: int, end_time: datetime,
                                    duration_seconds: float):
-        """Update an existing checkpoint with latest time"""
-        with self.get_session() as session:
-            record = session.query(Session).filter(Session.id == session_id).first()
-            if record:
-                record.end_time = end_time
-                record.duration_seconds = duration_seconds
-                session.commit()
+        """Queue latest time for a checkpoint (written by flush_checkpoints)"""
+        with self._checkpoint_lock:
+            self._pending_session_checkpoints[session_id] = (end_time, duration_seconds)
 
     def finalize_session_checkpoint(self, session_id: int, end_time: datetime,
                                      duration_seconds: float):
-        """Finalize checkpoint → completed session (is_checkpoint=0)"""
+        """Finalize checkpoint → completed session (is_checkpoint=False)"""
+        with self._checkpoint_lock:
+            self._pending_session_checkpoints.pop(session_id, None)
         with self.get_session() as session:
             record = session.query(Session).filter(Session.id == session_id).first()
             if record:
                 record.end_time = end_time
                 record.duration_seconds = duration_seconds
-                record.is_checkpoint = 0
+                record.is_checkpoint = False
                 session.commit()
                 print(f"💾 Checkpoint finalized: Session #{session_id} ({duration_seconds:.0f}s)")
 
     def save_client_visit_checkpoint(self, place_id: int, employee_id: int,
                                       track_id: int, enter_time: datetime) -> int:
-        """Create a checkpoint client visit record (is_checkpoint=1)"""
-        with self.get_session() as session:
-            visit = ClientVisit(
-                place_id=place_id,
-                employee_id=employee_id,
-                track_id=track_id,
-                visit_date=enter_time.date(),
-                enter_time=enter_time,
-                exit_time=tashkent_now(),
-                duration_seconds=0.0,
-                is_checkpoint=1
-            )
-            session.add(visit)
+        """Create a checkpoint client visit record (is_checkpoint=True)"""
+        stmt = insert(ClientVisit).values(
+            place_id=place_id,
+            employee_id=employee_id,
+            track_id=track_id,
+            visit_date=enter_time.date(),
+            enter_time=enter_time,
+            exit_time=tashkent_now(),
+            duration_seconds=0.0,
+            is_checkpoint=True
+        ).returning(ClientVisit.id)
+        with self.get_session() as session:
+            visit_id = session.execute(stmt).scalar_one()
             session.commit()
-            session.refresh(visit)
-            print(f"💾 Checkpoint created: ClientVisit #{visit.id} (Zone {place_id})")
-            return visit.id
+            print(f"💾 Checkpoint created: ClientVisit #{visit_id} (Zone {place_id})")
+            return visit_id
 
     def update_client_visit_checkpoint(self, visit_id: int, exit_time: datetime,
                                         duration_seconds: float):
-        """Update an existing client visit checkpoint"""
-        with self.get_session() as session:
-            record = session.query(ClientVisit).filter(ClientVisit.id == visit_id).first()
-            if record:
-                record.exit_time = exit_time
-                record.duration_seconds = duration_seconds
-                session.commit()
+        """Queue latest time for a client visit checkpoint (written by flush_checkpoints)"""
+        with self._checkpoint_lock:
+            self._pending_visit_checkpoints[visit_id] = (exit_time, duration_seconds)
 
     def finalize_client_visit_checkpoint(self, visit_id: int, exit_time: datetime,
                                           duration_seconds: float):
-        """Finalize client visit checkpoint → completed visit (is_checkpoint=0)"""
+        """Finalize client visit checkpoint → completed visit (is_checkpoint=False)"""
+        with self._checkpoint_lock:
+            self._pending_visit_checkpoints.pop(visit_id, None)
         with self.get_session() as session:
             record = session.query(ClientVisit).filter(ClientVisit.id == visit_id).first()
             if record:
                 record.exit_time = exit_time
                 record.duration_seconds = duration_seconds
-                record.is_checkpoint = 0
+                record.is_checkpoint = False
                 session.commit()
                 print(f"💾 Checkpoint finalized: ClientVisit #{visit_id} ({duration_seconds:.0f}s)")
 
+    def flush_checkpoints(self):
+        """Write all queued checkpoint updates in a single transaction.
+        Called once per main loop tick and on shutdown. Entries stay queued
+        until the write succeeds, so a failed flush is retried on the next call.
+        """
+        with self._checkpoint_lock:
+            if not self._pending_session_checkpoints and not self._pending_visit_checkpoints:
+                return
+            sessions = dict(self._pending_session_checkpoints)
+            visits = dict(self._pending_visit_checkpoints)
+        
+        session_rows = [
+            {"id": k, "end_time": v[0], "duration_seconds": v[1]}
+            for k, v in sessions.items()
+        ]
+        visit_rows = [
+            {"id": k, "exit_time": v[0], "duration_seconds": v[1]}
+            for k, v in visits.items()
+        ]
+        try:
+            with self.get_session() as session:
+                # ORM bulk UPDATE by primary key → one executemany per table
+                if session_rows:
+                    session.execute(update(Session), session_rows)
+                if visit_rows:
+                    session.execute(update(ClientVisit), visit_rows)
+                session.commit()
+        except Exception as e:
+            print(f"⚠️ Checkpoint flush failed ({e}), will retry")
+            return
+        
+        # Drop what was written; newer heartbeats queued meanwhile stay pending
+        with self._checkpoint_lock:
+            for pending, written in ((self._pending_session_checkpoints, sessions),
+                                     (self._pending_visit_checkpoints, visits)):
+                for k, v in written.items():
+                    if pending.get(k) is v:
+                        del pending[k]
+
     def finalize_stale_checkpoints(self):
-        """On startup: close any is_checkpoint=1 records from previous crash.
+        """On startup: close any is_checkpoint=True records from previous crash.
         These represent sessions that were active when power went out.
         """
         with self.get_session() as session:
             # Finalize stale session checkpoints
             stale_sessions = session.query(Session).filter(
-                Session.is_checkpoint == 1
+                Session.is_checkpoint == true()
             ).all()
             for s in stale_sessions:
-                s.is_checkpoint = 0
+                s.is_checkpoint = False
                 print(f"🔧 Recovered stale session checkpoint #{s.id} "
                       f"({s.duration_seconds:.0f}s)")
             
             # Finalize stale client visit checkpoints
             stale_visits = session.query(ClientVisit).filter(
-                ClientVisit.is_checkpoint == 1
+                ClientVisit.is_checkpoint == true()
             ).all()
             for v in stale_visits:
-                v.is_checkpoint = 0
+                v.is_checkpoint = False
                 print(f"🔧 Recovered stale client visit checkpoint #{v.id} "
                       f"({v.duration_seconds:.0f}s)")
             
@@ -576,12 +649,16 @@ class Database:
 
     # ============ Sync Operations ============
 
+    def count_unsynced(self) -> int:
+        """Count completed records still waiting for upload (without loading them)"""
+        return self._scalar(_SQL_UNSYNCED_COUNT) or 0
+
     def get_unsynced_sessions(self, limit: int = 50) -> List[dict]:
         """Get completed sessions pending synchronization (excludes active checkpoints)"""
         with self.get_session() as session:
             records = session.query(Session).filter(
-                Session.is_synced == 0,
-                Session.is_checkpoint == 0
+                Session.is_synced == false(),
+                Session.is_checkpoint == false()
             ).limit(limit).all()
             
             return [
@@ -601,7 +678,7 @@ class Database:
         """Get all active checkpoint sessions (currently sitting) for real-time cloud sync"""
         with self.get_session() as session:
             records = session.query(Session).filter(
-                Session.is_checkpoint == 1
+                Session.is_checkpoint == true()
             ).all()
             
             return [
@@ -621,8 +698,8 @@ class Database:
         """Get completed client visits pending synchronization (excludes active checkpoints)"""
         with self.get_session() as session:
             records = session.query(ClientVisit).filter(
-                ClientVisit.is_synced == 0,
-                ClientVisit.is_checkpoint == 0
+                ClientVisit.is_synced == false(),
+                ClientVisit.is_checkpoint == false()
             ).limit(limit).all()
             
             return [
@@ -656,7 +733,7 @@ class Database:
         """Get unsynced client crossing events"""
         with self.get_session() as session:
             records = session.query(ClientCrossing).filter(
-                ClientCrossing.is_synced == 0
+                ClientCrossing.is_synced == false()
             ).limit(limit).all()
             
             return [
@@ -673,22 +750,28 @@ class Database:
 
     def mark_as_synced(self, table_type: str, record_ids: List[int]):
         """Mark records as synced"""
-        if not record_ids:
+        if not record_ids or table_type not in _MARK_SYNCED:
             return
             
-        if table_type == "session":
-            model = Session
-        elif table_type == "client_visit":
-            model = ClientVisit
-        elif table_type == "client_crossing":
-            model = ClientCrossing
-        else:
+        with self.get_session() as session:
+            session.execute(_MARK_SYNCED[table_type], {"ids": list(record_ids)})
+            session.commit()
+
+    def mark_many_as_synced(self, session_ids: List[int], visit_ids: List[int],
+                            crossing_ids: List[int] = None):
+        """Mark sessions, client visits and crossings as synced in one transaction"""
+        batches = (
+            ("session", session_ids),
+            ("client_visit", visit_ids),
+            ("client_crossing", crossing_ids),
+        )
+        if not any(ids for _, ids in batches):
             return
-            
+        
         with self.get_session() as session:
-            session.query(model).filter(
-                model.id.in_(record_ids)
-            ).update({"is_synced": 1}, synchronize_session=False)
+            for table_type, ids in batches:
+                if ids:
+                    session.execute(_MARK_SYNCED[table_type], {"ids": list(ids)})
             session.commit()
 
 
@@ -703,11 +786,21 @@ class Database:
         existing = self.get_all_employees()
         existing_names = {e['name'] for e in existing}
         
-        created = 0
-        for wp_id, name in workplace_owners.items():
-            if name not in existing_names:
-                self.create_employee(name=name, position="Оператор")
-                created += 1
+        # dict.fromkeys: de-duplicate names while keeping config order
+        new_names = [
+            name for name in dict.fromkeys(workplace_owners.values())
+            if name not in existing_names
+        ]
+        created = len(new_names)
+        
+        if new_names:
+            # One executemany INSERT + one commit for all new operators
+            with self.get_session() as session:
+                session.execute(
+                    insert(Employee),
+                    [{"name": name, "position": "Оператор"} for name in new_names]
+                )
+                session.commit()
         
         if created:
             print(f"👥 Создано {created} операторов из конфигурации")
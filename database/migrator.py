@@ -65,3 +65,50 @@ def update_schema(engine: Engine, base_model: DeclarativeMeta):
                 # Table doesn't exist - database.create_all() should have handled this, 
                 # but if not, we leave it be as create_all is called before this function.
                 pass
+
+
+# Indexes replaced by the partial / date-first ones in models.py. Only these are
+# ever dropped — other indexes (e.g. created by hand) are left alone.
+SUPERSEDED_INDEXES = (
+    "ix_sessions_sync",
+    "ix_sessions_place_date",
+    "ix_cv_sync",
+    "ix_cv_place_date",
+)
+
+
+def ensure_indexes(engine: Engine, base_model: DeclarativeMeta):
+    """
+    Creates indexes declared on the models that are missing from existing tables
+    and drops the ones listed in SUPERSEDED_INDEXES.
+    create_all() only emits indexes together with a brand-new table.
+    """
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+
+    for table_name, table_obj in base_model.metadata.tables.items():
+        if table_name not in existing_tables:
+            continue
+
+        existing_indexes = {idx['name'] for idx in inspector.get_indexes(table_name)}
+        declared_indexes = {index.name for index in table_obj.indexes}
+
+        for name in SUPERSEDED_INDEXES:
+            # Present only on databases created before the switch: drops (and logs) once
+            if name not in existing_indexes or name in declared_indexes:
+                continue
+            try:
+                print(f"[MIGRATE] Dropping superseded index: {name} on {table_name}")
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            except Exception as e:
+                print(f"[MIGRATE] ERROR dropping index {name}: {e}")
+
+        for index in table_obj.indexes:
+            if index.name in existing_indexes:
+                continue
+            try:
+                print(f"[MIGRATE] Creating index: {index.name} on {table_name}")
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"[MIGRATE] ERROR creating index {index.name}: {e}")
@@ -3,11 +3,14 @@ Database models for Workplace Monitoring
 Supports multiple cameras
 """
 from datetime import datetime, date
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Date, JSON, Float, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Date, JSON, Float, ForeignKey, Index, Boolean, text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
 
+# Boolean flag stored as 0/1 in SQLite; cloud (PostgreSQL) tables keep INTEGER flags
+SyncFlag = Boolean().with_variant(Integer(), "postgresql")
+
 
 class Camera(Base):
     """IP Camera configuration"""
@@ -75,6 +78,14 @@ class Place(Base):
 class Session(Base):
     """Work session record (for employees)"""
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Partial indexes: sync/checkpoint scans only touch pending rows
+        Index("ix_sessions_unsynced", "is_checkpoint", sqlite_where=text("is_synced = 0")),
+        Index("ix_sessions_active_checkpoint", "place_id", sqlite_where=text("is_checkpoint = 1")),
+        # Date first: serves both per-date listings and per-place daily totals
+        Index("ix_sessions_date_place", "session_date", "place_id"),
+        Index("ix_sessions_emp_date", "employee_id", "session_date"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     place_id = Column(Integer, ForeignKey("places.id", ondelete="SET NULL"), nullable=True)
@@ -84,8 +95,8 @@ class Session(Base):
     end_time = Column(DateTime, nullable=True)
     duration_seconds = Column(Float, default=0.0)
     session_date = Column(Date, default=date.today)
-    is_synced = Column(Integer, default=0)  # 0=False, 1=True
-    is_checkpoint = Column(Integer, default=0)  # 0=finished, 1=active checkpoint
+    is_synced = Column(SyncFlag, default=False, nullable=False)
+    is_checkpoint = Column(SyncFlag, default=False, nullable=False)  # False=finished, True=active checkpoint
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -99,6 +110,12 @@ class Session(Base):
 class ClientVisit(Base):
     """Client visit record (for client zones with ByteTrack)"""
     __tablename__ = "client_visits"
+    __table_args__ = (
+        Index("ix_cv_unsynced", "is_checkpoint", sqlite_where=text("is_synced = 0")),
+        Index("ix_cv_active_checkpoint", "place_id", sqlite_where=text("is_checkpoint = 1")),
+        Index("ix_cv_date_place", "visit_date", "place_id"),
+        Index("ix_cv_emp_date", "employee_id", "visit_date"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     place_id = Column(Integer, ForeignKey("places.id", ondelete="SET NULL"), nullable=True)
@@ -109,8 +126,8 @@ class ClientVisit(Base):
     enter_time = Column(DateTime, nullable=False)
     exit_time = Column(DateTime, nullable=True)
     duration_seconds = Column(Float, default=0.0)
-    is_synced = Column(Integer, default=0)  # 0=False, 1=True
-    is_checkpoint = Column(Integer, default=0)  # 0=finished, 1=active checkpoint
+    is_synced = Column(SyncFlag, default=False, nullable=False)
+    is_checkpoint = Column(SyncFlag, default=False, nullable=False)  # False=finished, True=active checkpoint
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -127,6 +144,9 @@ class ClientCrossing(Base):
     Used for general traffic counting.
     """
     __tablename__ = "client_crossings"
+    __table_args__ = (
+        Index("ix_crossings_unsynced", "is_synced", sqlite_where=text("is_synced = 0")),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="SET NULL"), nullable=True)
@@ -134,7 +154,7 @@ class ClientCrossing(Base):
     track_id = Column(Integer, nullable=False)  # Centroid Tracker ID
     crossed_at = Column(DateTime, nullable=False)
     log_date = Column(Date, nullable=False)
-    is_synced = Column(Integer, default=0)  # 0=False, 1=True
+    is_synced = Column(SyncFlag, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
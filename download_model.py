@@ -14,6 +14,43 @@ from pathlib import Path
 # YOLOv10s from ultralytics releases
 MODEL_URL = "https://github.com/THU-MIG/yolov10/releases/download/v1.1/yolov10s.pt"
 MODEL_FILENAME = "yolov10s.pt"
+DOWNLOAD_CHUNK = 1024 * 1024  # 1 MB reads/writes instead of 8 KB
+
+
+def download_file(url: str, filename: str):
+    """
+    Stream url to filename in large chunks over a persistent HTTP session.
+    Writes to a .part file first so an interrupted download is never
+    mistaken for a complete model on the next run.
+    """
+    part_path = filename + ".part"
+    try:
+        with requests.Session() as http:
+            response = http.get(url, allow_redirects=True, stream=True, timeout=(5, 30))
+            response.raise_for_status()
+            
+            total_size = int(response.headers.get('content-length', 0))
+            downloaded = 0
+            
+            with open(part_path, 'wb', buffering=0) as f:
+                if total_size > 0 and hasattr(os, "posix_fallocate"):
+                    os.posix_fallocate(f.fileno(), 0, total_size)
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    if total_size > 0:
+                        pct = downloaded / total_size * 100
+                        print(f"\r   Progress: {pct:.1f}% ({downloaded / 1024 / 1024:.1f} MB)", end="", flush=True)
+        
+        if total_size > 0 and downloaded < total_size:
+            raise IOError(f"incomplete download ({downloaded} of {total_size} bytes)")
+    except BaseException:
+        # Don't leave a partial (possibly preallocated) file behind
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, filename)
+    print()  # newline after progress
 
 
 def download_model():
@@ -27,21 +64,7 @@ def download_model():
     print(f"   URL: {MODEL_URL}")
     
     try:
-        response = requests.get(MODEL_URL, allow_redirects=True, stream=True)
-        response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
-        
-        with open(MODEL_FILENAME, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0:
-                    pct = downloaded / total_size * 100
-                    print(f"\r   Progress: {pct:.1f}% ({downloaded / 1024 / 1024:.1f} MB)", end="", flush=True)
-        
-        print()  # newline after progress
+        download_file(MODEL_URL, MODEL_FILENAME)
         size_mb = os.path.getsize(MODEL_FILENAME) / (1024 * 1024)
         print(f"✅ Downloaded {MODEL_FILENAME} ({size_mb:.1f} MB)")
         return True
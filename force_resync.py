@@ -13,24 +13,55 @@ sys.path.insert(0, str(PROJECT_ROOT))
 from dotenv import load_dotenv
 load_dotenv(PROJECT_ROOT / ".env")
 
+from sqlalchemy import false, func, select, text, true, update
+
 from database.db import db
 from database.models import Session, ClientVisit
 
+# Rows per transaction: bounds WAL growth and lets the app read between chunks
+CHUNK_SIZE = 50_000
+
+
+def _reset_in_chunks(session, model) -> tuple:
+    """
+    Set is_synced=False for a table in primary-key ranges, one commit per range.
+    Returns (rows reset now, total rows waiting for resync incl. already unsynced).
+    """
+    max_id = session.execute(select(func.max(model.id))).scalar() or 0
+    total = 0
+    for lo in range(0, max_id + 1, CHUNK_SIZE):
+        # synchronize_session=False skips evaluating rows in Python
+        count = session.execute(
+            update(model)
+            .where(model.id.between(lo, lo + CHUNK_SIZE - 1), model.is_synced == true())
+            .values(is_synced=False)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        session.commit()
+        session.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+        total += count
+        if count:
+            print(f"   {model.__tablename__}: ids {lo}-{lo + CHUNK_SIZE - 1} -> {count} reset")
+    
+    pending = session.execute(
+        select(func.count(model.id)).where(model.is_synced == false())
+    ).scalar()
+    return total, pending
+
+
 def force_resync():
     print("🔄 Resetting sync status for ALL records...")
     
     with db.get_session() as session:
         # Reset Sessions
-        count_s = session.query(Session).update({Session.is_synced: 0})
+        reset_s, count_s = _reset_in_chunks(session, Session)
         
         # Reset Client Visits
-        count_v = session.query(ClientVisit).update({ClientVisit.is_synced: 0})
-        
-        session.commit()
+        reset_v, count_v = _reset_in_chunks(session, ClientVisit)
         
         print(f"✅ Reset complete.")
-        print(f"   Sessions to resync: {count_s}")
-        print(f"   Client Visits to resync: {count_v}")
+        print(f"   Sessions to resync: {count_s} ({reset_s} newly reset)")
+        print(f"   Client Visits to resync: {count_v} ({reset_v} newly reset)")
         print("\n🚀 Startup the application now, and it will upload everything to Cloud DB.")
 
 if __name__ == "__main__":
@@ -3,25 +3,199 @@ Display utilities for rendering status and time overlays
 """
 import cv2
 import numpy as np
-import sys
-from pathlib import Path
+from functools import lru_cache
 from typing import Dict, Tuple
-from datetime import timedelta
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import TEXT_COLOR, FONT_SCALE, LINE_THICKNESS
 
 
-def format_duration(seconds: float) -> str:
-    """Format seconds as HH:MM:SS"""
-    if seconds < 0:
-        seconds = 0
-    td = timedelta(seconds=int(seconds))
-    hours, remainder = divmod(int(td.total_seconds()), 3600)
+# Pre-rendered static panel parts: key -> (y_slice, x_slice, premultiplied BGR, 1 - alpha)
+_panel_cache: Dict[tuple, Tuple[slice, slice, np.ndarray, np.ndarray]] = {}
+_PANEL_CACHE_MAX = 256
+
+# Hershey digits share one advance width, so every "HH:MM:SS" measures the same
+_TIMER_TEXT_WH = cv2.getTextSize(
+    "00:00:00", cv2.FONT_HERSHEY_SIMPLEX, FONT_SCALE, LINE_THICKNESS
+)[0]
+
+# Employee panel stat lines: the labels are baked into the panel sprite and only
+# the values are drawn per frame, one label advance to the right (getTextSize
+# reports one pixel more than putText advances)
+_EMPLOYEE_LINE_HEIGHT = 18
+_EMPLOYEE_STAT_LINES = (
+    ("Time: ", (255, 255, 255)),
+    ("Clients: ", (0, 255, 150)),
+    ("Service: ", (200, 200, 200)),
+)
+_EMPLOYEE_VALUE_DX = tuple(
+    cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.38, 1)[0][0] - 1
+    for label, _ in _EMPLOYEE_STAT_LINES
+)
+
+
+@lru_cache(maxsize=4096)
+def _fmt_hms(total_seconds: int) -> str:
+    """HH:MM:SS for whole seconds (memoized — overlays redraw the same second many times)"""
+    hours, remainder = divmod(total_seconds, 3600)
     minutes, secs = divmod(remainder, 60)
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
+def format_duration(seconds: float) -> str:
+    """Format seconds as HH:MM:SS"""
+    return _fmt_hms(max(0, int(seconds)))
+
+
+@lru_cache(maxsize=16)
+def _solid_block(height: int, width: int, color: Tuple[int, int, int]) -> np.ndarray:
+    """Reusable solid-colour buffer for region blending (treat as read-only)"""
+    return np.full((height, width, 3), color, np.uint8)
+
+
+def _blend_region(frame: np.ndarray, x1: int, y1: int, x2: int, y2: int,
+                  color: Tuple[int, int, int], alpha: float):
+    """
+    In-place equivalent of drawing a filled rectangle on a frame copy and
+    cv2.addWeighted()-ing it back — but only touching the rectangle itself.
+    """
+    frame_h, frame_w = frame.shape[:2]
+    x1, y1 = max(0, x1), max(0, y1)
+    x2, y2 = min(frame_w - 1, x2), min(frame_h - 1, y2)
+    if x2 < x1 or y2 < y1:
+        return
+    region = frame[y1:y2 + 1, x1:x2 + 1]
+    solid = _solid_block(region.shape[0], region.shape[1], color)
+    cv2.addWeighted(solid, alpha, region, 1 - alpha, 0, dst=region)
+
+
+def _make_sprite(x: int, y: int, height: int, width: int, frame_shape: tuple,
+                 draw_static, *args) -> tuple:
+    """
+    Pre-render a panel as (premultiplied BGR, 1 - alpha) so it can be blended
+    onto just its frame region. draw_static(canvas, *args) draws the panel in
+    canvas-local coordinates; rendering it over black and over white recovers
+    the exact per-pixel colour and opacity (incl. anti-aliased text edges).
+    """
+    frame_h, frame_w = frame_shape[:2]
+    h = max(0, min(height, frame_h - y))
+    w = max(0, min(width, frame_w - x))
+    
+    over_black = draw_static(np.zeros((height, width, 3), np.uint8), *args)[:h, :w]
+    over_white = draw_static(np.full((height, width, 3), 255, np.uint8), *args)[:h, :w]
+    
+    over_black = over_black.astype(np.float32)
+    inv_alpha = (over_white.astype(np.float32) - over_black) / 255.0
+    # +0.5 so the final astype() rounds like cv2.addWeighted
+    return slice(y, y + h), slice(x, x + w), over_black + 0.5, inv_alpha
+
+
+def _blit_sprite(frame: np.ndarray, sprite: tuple):
+    """Alpha-blend a cached sprite onto its (small) frame region in place"""
+    ys, xs, premultiplied, inv_alpha = sprite
+    region = frame[ys, xs]
+    # Same float32 math as numpy, but without its temporaries
+    blended = cv2.multiply(region, inv_alpha, dtype=cv2.CV_32F)
+    cv2.add(blended, premultiplied, dst=blended)
+    region[:] = blended.astype(np.uint8)
+
+
+def _cache_sprite(key: tuple, sprite: tuple) -> tuple:
+    """Store a sprite, dropping everything once the cache grows too large"""
+    if len(_panel_cache) >= _PANEL_CACHE_MAX:
+        _panel_cache.clear()
+    _panel_cache[key] = sprite
+    return sprite
+
+
+def _draw_help_static(canvas: np.ndarray, help_text: list,
+                      panel_width: int, panel_height: int) -> np.ndarray:
+    """Help panel background + text in panel-local coordinates"""
+    overlay = canvas.copy()
+    cv2.rectangle(overlay, (0, 0), (panel_width, panel_height), (0, 0, 0), -1)
+    canvas = cv2.addWeighted(overlay, 0.7, canvas, 0.3, 0)
+    
+    for i, text in enumerate(help_text):
+        cv2.putText(
+            canvas, text, (10, 25 + i * 22),
+            cv2.FONT_HERSHEY_SIMPLEX, 0.45, TEXT_COLOR, 1
+        )
+    return canvas
+
+
+def _draw_employee_static(canvas: np.ndarray, name: str,
+                          panel_width: int, panel_height: int) -> np.ndarray:
+    """Employee panel background, border and name in panel-local coordinates"""
+    # Semi-transparent background
+    overlay = canvas.copy()
+    cv2.rectangle(overlay, (0, 0), (panel_width, panel_height), (20, 20, 20), -1)
+    canvas = cv2.addWeighted(overlay, 0.8, canvas, 0.2, 0)
+    
+    # Border
+    cv2.rectangle(canvas, (0, 0), (panel_width, panel_height), (0, 200, 200), 1)
+    
+    # Name (yellow)
+    cv2.putText(canvas, name, (5, 14),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+    
+    # Stat labels (values are drawn per frame)
+    for i, (label, color) in enumerate(_EMPLOYEE_STAT_LINES, start=1):
+        cv2.putText(canvas, label, (5, 14 + i * _EMPLOYEE_LINE_HEIGHT),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.38, color, 1)
+    return canvas
+
+
+def _build_employee_sprite(panel_x: int, panel_y: int, panel_width: int,
+                           panel_height: int, name: str, frame_shape: tuple) -> tuple:
+    """Render the static part of an employee panel once"""
+    # A long name or the stat labels may spill past the panel, so the canvas covers them too
+    (name_w, _), _ = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)
+    width = max(panel_width, 5 + name_w, 5 + max(_EMPLOYEE_VALUE_DX)) + 2
+    height = max(panel_height, 14 + len(_EMPLOYEE_STAT_LINES) * _EMPLOYEE_LINE_HEIGHT) + 6
+    return _make_sprite(panel_x, panel_y, height, width, frame_shape,
+                        _draw_employee_static, name, panel_width, panel_height)
+
+
+def _layout_employee_panel(roi_bbox, cx: int, cy: int, name: str,
+                           frame_shape: tuple) -> tuple:
+    """Place an employee panel inside its ROI and render its static sprite"""
+    # Use ROI polygon bounding box
+    if roi_bbox is not None:
+        min_x, min_y, max_x, max_y = roi_bbox
+    else:
+        min_x = cx - 90
+        max_x = cx + 90
+        min_y = cy - 50
+        max_y = cy + 50
+    
+    # Panel dimensions
+    panel_width = 170
+    panel_height = _EMPLOYEE_LINE_HEIGHT * 4 + 12
+    
+    # Scale panel if ROI is too small
+    roi_w = max_x - min_x
+    roi_h = max_y - min_y
+    if panel_width > roi_w - 8:
+        panel_width = max(100, roi_w - 8)
+    if panel_height > roi_h - 8:
+        panel_height = max(50, roi_h - 8)
+    
+    # Position: INSIDE the ROI, bottom-right corner with padding
+    panel_x = max_x - panel_width - 4
+    panel_y = max_y - panel_height - 4
+    
+    # Ensure we stay inside the ROI bounds
+    panel_x = max(min_x + 2, panel_x)
+    panel_y = max(min_y + 2, panel_y)
+    
+    # Clamp to frame bounds
+    frame_h, frame_w = frame_shape[:2]
+    panel_x = max(0, min(panel_x, frame_w - panel_width))
+    panel_y = max(0, min(panel_y, frame_h - panel_height))
+    
+    return _build_employee_sprite(panel_x, panel_y, panel_width, panel_height,
+                                  name, frame_shape)
+
+
 def draw_timer_overlay(frame: np.ndarray, 
                        roi_timers: Dict[int, float],
                        roi_positions: Dict[int, Tuple[int, int]]) -> np.ndarray:
@@ -36,17 +210,23 @@ def draw_timer_overlay(frame: np.ndarray,
     Returns:
         Frame with timer overlays
     """
-    for roi_id, seconds in roi_timers.items():
-        if roi_id not in roi_positions:
-            continue
-        
-        x, y = roi_positions[roi_id]
+    # Render list of drawable ROIs built up front; the draw loop does no dict lookups
+    render_list = [
+        (roi_positions[roi_id], seconds)
+        for roi_id, seconds in roi_timers.items() if roi_id in roi_positions
+    ]
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    
+    for (x, y), seconds in render_list:
         time_str = format_duration(seconds)
         
         # Draw timer background
-        (text_w, text_h), _ = cv2.getTextSize(
-            time_str, cv2.FONT_HERSHEY_SIMPLEX, FONT_SCALE, LINE_THICKNESS
-        )
+        if len(time_str) == 8:
+            text_w, text_h = _TIMER_TEXT_WH
+        else:  # 100+ hours
+            (text_w, text_h), _ = cv2.getTextSize(
+                time_str, font, FONT_SCALE, LINE_THICKNESS
+            )
         cv2.rectangle(
             frame,
             (x - 5, y - text_h - 5),
@@ -57,7 +237,7 @@ def draw_timer_overlay(frame: np.ndarray,
         # Draw timer text
         cv2.putText(
             frame, time_str, (x, y),
-            cv2.FONT_HERSHEY_SIMPLEX, FONT_SCALE, (0, 255, 255), LINE_THICKNESS
+            font, FONT_SCALE, (0, 255, 255), LINE_THICKNESS
         )
     
     return frame
@@ -78,9 +258,7 @@ def draw_stats_panel(frame: np.ndarray, stats: Dict) -> np.ndarray:
     panel_height = 120
     panel_width = 250
     
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (10, 10), (10 + panel_width, 10 + panel_height), (0, 0, 0), -1)
-    frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+    _blend_region(frame, 10, 10, 10 + panel_width, 10 + panel_height, (0, 0, 0), 0.7)
     
     y_offset = 35
     line_height = 25
@@ -114,21 +292,17 @@ def draw_help_panel(frame: np.ndarray) -> np.ndarray:
         "Q - Quit"
     ]
     
-    # Panel background
+    # Panel background + text never change: render once per frame size
     panel_width = 180
     panel_height = len(help_text) * 22 + 20
-    x = w - panel_width - 10
-    y = 10
-    
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (x, y), (x + panel_width, y + panel_height), (0, 0, 0), -1)
-    frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
-    
-    for i, text in enumerate(help_text):
-        cv2.putText(
-            frame, text, (x + 10, y + 25 + i * 22),
-            cv2.FONT_HERSHEY_SIMPLEX, 0.45, TEXT_COLOR, 1
-        )
+    key = ("help", h, w)
+    sprite = _panel_cache.get(key)
+    if sprite is None:
+        sprite = _cache_sprite(key, _make_sprite(
+            w - panel_width - 10, 10, panel_height + 1, panel_width + 1, frame.shape,
+            _draw_help_static, help_text, panel_width, panel_height
+        ))
+    _blit_sprite(frame, sprite)
     
     return frame
 
@@ -154,86 +328,23 @@ def draw_employee_stats_overlay(frame: np.ndarray,
         client_count = stats.get('client_count', 0)
         service_time = stats.get('client_service_time', 0)
         
-        # Use ROI polygon to find bounding box
-        roi_pts = stats.get('roi_points', None)
-        if roi_pts is not None and len(roi_pts) > 0:
-            pts_array = np.array(roi_pts)
-            min_x = int(np.min(pts_array[:, 0]))
-            max_x = int(np.max(pts_array[:, 0]))
-            min_y = int(np.min(pts_array[:, 1]))
-            max_y = int(np.max(pts_array[:, 1]))
-        else:
-            min_x = cx - 90
-            max_x = cx + 90
-            min_y = cy - 50
-            max_y = cy + 50
-        
-        # Panel dimensions
-        line_height = 18
-        panel_width = 170
-        panel_height = line_height * 4 + 12
-        
-        # Scale panel if ROI is too small
-        roi_w = max_x - min_x
-        roi_h = max_y - min_y
-        if panel_width > roi_w - 8:
-            panel_width = max(100, roi_w - 8)
-        if panel_height > roi_h - 8:
-            panel_height = max(50, roi_h - 8)
-        
-        # Position: INSIDE the ROI, bottom-right corner with padding
-        panel_x = max_x - panel_width - 4
-        panel_y = max_y - panel_height - 4
-        
-        # Ensure we stay inside the ROI bounds
-        panel_x = max(min_x + 2, panel_x)
-        panel_y = max(min_y + 2, panel_y)
-        
-        # Clamp to frame bounds
-        frame_h, frame_w = frame.shape[:2]
-        panel_x = max(0, min(panel_x, frame_w - panel_width))
-        panel_y = max(0, min(panel_y, frame_h - panel_height))
-        
-        # Semi-transparent background
-        overlay = frame.copy()
-        cv2.rectangle(
-            overlay,
-            (panel_x, panel_y),
-            (panel_x + panel_width, panel_y + panel_height),
-            (20, 20, 20), -1
-        )
-        frame = cv2.addWeighted(overlay, 0.8, frame, 0.2, 0)
-        
-        # Border
-        cv2.rectangle(
-            frame,
-            (panel_x, panel_y),
-            (panel_x + panel_width, panel_y + panel_height),
-            (0, 200, 200), 1
-        )
-        
-        # Text
-        tx = panel_x + 5
-        ty = panel_y + 14
-        
-        # Name (yellow)
-        cv2.putText(frame, name, (tx, ty),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
-        ty += line_height
-        
-        # Work time
-        cv2.putText(frame, f"Time: {format_duration(work_time)}", (tx, ty),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.38, (255, 255, 255), 1)
-        ty += line_height
-        
-        # Client count
-        cv2.putText(frame, f"Clients: {client_count}", (tx, ty),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.38, (0, 255, 150), 1)
-        ty += line_height
+        roi_bbox = stats.get('roi_bbox', None)
+        key = (roi_id, name, roi_bbox, cx, cy, frame.shape[:2])
+        sprite = _panel_cache.get(key)
+        if sprite is None:
+            sprite = _cache_sprite(key, _layout_employee_panel(
+                roi_bbox, cx, cy, name, frame.shape
+            ))
+        _blit_sprite(frame, sprite)
         
-        # Service time
-        cv2.putText(frame, f"Service: {format_duration(service_time)}", (tx, ty),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.38, (200, 200, 200), 1)
+        # Dynamic values only: work time, client count, service time
+        tx = sprite[1].start + 5
+        ty = sprite[0].start + 14
+        values = (format_duration(work_time), str(client_count), format_duration(service_time))
+        for value, dx, (_, color) in zip(values, _EMPLOYEE_VALUE_DX, _EMPLOYEE_STAT_LINES):
+            ty += _EMPLOYEE_LINE_HEIGHT
+            cv2.putText(frame, value, (tx + dx, ty),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.38, color, 1)
     
     return frame
 
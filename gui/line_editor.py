@@ -3,11 +3,8 @@ Interactive Line Editor using OpenCV mouse events
 """
 import cv2
 import numpy as np
-import sys
-from pathlib import Path
 from typing import List, Tuple, Optional
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import ROI_COLOR_DRAWING, TEXT_COLOR
 
 class LineEditor:
@@ -3,39 +3,49 @@ Interactive ROI Editor using OpenCV mouse events
 """
 import cv2
 import numpy as np
-import sys
-from pathlib import Path
 from typing import List, Tuple, Optional, Callable
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import ROI_COLOR_DRAWING, TEXT_COLOR
 
 
 class ROIEditor:
     """Interactive polygon ROI editor"""
     
+    MAX_POINTS = 256
+    
     def __init__(self, window_name: str = "ROI Editor"):
         self.window_name = window_name
-        self.current_points: List[Tuple[int, int]] = []
+        # Points live in a preallocated int32 buffer, drawn without per-frame conversion
+        self._buf = np.empty((self.MAX_POINTS, 2), dtype=np.int32)
+        self._n = 0
         self.is_drawing = False
         self.on_roi_complete: Optional[Callable] = None
+    
+    @property
+    def current_points(self) -> List[Tuple[int, int]]:
+        """Points of the polygon being drawn"""
+        return [tuple(pt) for pt in self._buf[:self._n].tolist()]
         
     def start_drawing(self):
         """Start drawing a new ROI"""
-        self.current_points = []
+        self._n = 0
         self.is_drawing = True
         print("🎨 ROI Drawing mode: Click to add points, press ENTER to finish")
     
     def stop_drawing(self):
         """Stop drawing mode"""
         self.is_drawing = False
-        self.current_points = []
+        self._n = 0
     
     def add_point(self, x: int, y: int):
         """Add a point to current polygon"""
         if self.is_drawing:
-            self.current_points.append((x, y))
-            print(f"   Point {len(self.current_points)}: ({x}, {y})")
+            if self._n >= self.MAX_POINTS:
+                print(f"⚠️ ROI point limit reached ({self.MAX_POINTS})")
+                return
+            self._buf[self._n] = (x, y)
+            self._n += 1
+            print(f"   Point {self._n}: ({x}, {y})")
     
     def finish_roi(self) -> Optional[List[Tuple[int, int]]]:
         """
@@ -44,9 +54,9 @@ class ROIEditor:
         Returns:
             List of points if valid ROI (4+ points), None otherwise
         """
-        if len(self.current_points) >= 4:
-            points = self.current_points.copy()
-            self.current_points = []
+        if self._n >= 4:
+            points = self.current_points
+            self._n = 0
             self.is_drawing = False
             return points
         else:
@@ -55,7 +65,7 @@ class ROIEditor:
     
     def cancel_drawing(self):
         """Cancel current drawing"""
-        self.current_points = []
+        self._n = 0
         self.is_drawing = False
         print("❌ ROI drawing cancelled")
     
@@ -69,22 +79,17 @@ class ROIEditor:
         Returns:
             Frame with current polygon drawn
         """
-        if not self.current_points:
+        if not self._n:
             return frame
         
-        pts = np.array(self.current_points, dtype=np.int32)
+        pts = self._buf[:self._n]
         
-        # Draw lines between points
-        for i in range(len(self.current_points) - 1):
-            cv2.line(
-                frame, 
-                self.current_points[i], 
-                self.current_points[i + 1],
-                ROI_COLOR_DRAWING, 2
-            )
+        # Draw lines between points (one open polyline call)
+        if len(pts) > 1:
+            cv2.polylines(frame, [pts], False, ROI_COLOR_DRAWING, 2)
         
         # Draw points
-        for i, pt in enumerate(self.current_points):
+        for i, pt in enumerate(pts.tolist()):
             cv2.circle(frame, pt, 5, ROI_COLOR_DRAWING, -1)
             cv2.putText(
                 frame, str(i + 1), (pt[0] + 10, pt[1] - 10),
@@ -92,13 +97,13 @@ class ROIEditor:
             )
         
         # Draw polygon preview if 3+ points
-        if len(self.current_points) >= 3:
+        if self._n >= 3:
             cv2.polylines(frame, [pts], True, ROI_COLOR_DRAWING, 1)
         
         # Draw instruction
         if self.is_drawing:
             cv2.putText(
-                frame, f"Drawing ROI: {len(self.current_points)} points (ENTER to finish, ESC to cancel)",
+                frame, f"Drawing ROI: {self._n} points (ENTER to finish, ESC to cancel)",
                 (10, frame.shape[0] - 20),
                 cv2.FONT_HERSHEY_SIMPLEX, 0.6, TEXT_COLOR, 2
             )
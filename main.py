@@ -24,6 +24,7 @@ Controls:
 - Q: Quit
 """
 import cv2
+import numpy as np
 import sys
 from pathlib import Path
 import time
@@ -33,9 +34,10 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import (CAMERAS, ROI_COLOR_OCCUPIED, ROI_COLOR_VACANT, print_config,
                     AUTO_CYCLE_INTERVAL, AUTO_CYCLE_PAUSE_DURATION,
-                    FULLSCREEN_MODE)
+                    FULLSCREEN_MODE, UI_TARGET_FPS)
 from core.stream_handler import StreamHandler
 from core.detector import PersonDetector
+from core.inference_worker import InferenceWorker
 from core.roi_manager import ROIManager
 from core.occupancy_engine import OccupancyEngine
 from core.sync_service import sync_service
@@ -79,12 +81,16 @@ class CameraMonitor:
         self.line_engine = None
         self._init_line_engine()
 
-        # CPU Optimization: Frame Skipping
-        self.frame_skip_counter = 0
-        self.SKIP_FRAMES = 2  # Process 1, Skip 2 (Effective 1/3 FPS for detection)
-        # We store the *results* of detection to redraw them on skipped frames
+        # Latest detections, published by the InferenceWorker thread
+        # (every UI frame reuses them until fresher ones arrive)
         self.last_detections = []
         
+        # Overlay stats change on a per-second scale: re-read them at most once per TTL
+        self.STATS_TTL_SEC = 1.0
+        self._place_stats = {}
+        self._place_stats_key = None
+        self._place_stats_time = 0.0
+        
     def _init_line_engine(self):
         """Initialize line crossing engine if configured"""
         from config import LINE_HISTORY_SIZE, LINE_COOLDOWN_SEC, LINE_TOLERANCE
@@ -102,6 +108,19 @@ class CameraMonitor:
         else:
             self.line_engine = None
     
+    def invalidate_stats(self):
+        """Force the next frame to re-read overlay stats from the database"""
+        self._place_stats_key = None
+    
+    def _get_place_stats(self, today: date) -> dict:
+        """Per-zone overlay stats, cached for STATS_TTL_SEC"""
+        now = time.monotonic()
+        if self._place_stats_key != today or now - self._place_stats_time >= self.STATS_TTL_SEC:
+            self._place_stats = db.get_place_stats_for_camera(self.camera_db_id, today)
+            self._place_stats_key = today
+            self._place_stats_time = now
+        return self._place_stats
+    
     def connect(self) -> bool:
         """Connect to camera stream"""
         # StreamHandler.start() now launches a thread
@@ -115,20 +134,13 @@ class CameraMonitor:
     
     def process_frame(self, frame):
         """Process a single frame"""
-        # Optimization: Frame Skipping
-        self.frame_skip_counter += 1
-        run_detection = (self.frame_skip_counter % (self.SKIP_FRAMES + 1) == 0)
-        
-        if run_detection:
-            # 1. Detect persons (Single YOLOv8s model)
-            detections = self.detector.detect(frame)
-            
-            # Save for next frames
-            self.last_detections = detections
-            
-        else:
-            # Skip detection, reuse last results (but redraw them on new frame)
-            detections = self.last_detections
+        self.update_state()
+        return self.render(frame)
+    
+    def update_state(self):
+        """Advance zone occupancy and line crossings from the latest detections (no drawing)"""
+        # Detection runs on the inference thread; use its most recent result
+        detections = self.last_detections
         
         # Extract centers for ROI presence check
         person_centers = [det.center for det in detections]
@@ -136,21 +148,37 @@ class CameraMonitor:
         # Check presence in ROIs (We do this EVERY frame to keep UI responsive)
         presence = self.roi_manager.check_presence(person_centers)
         
-        # Update occupancy engine for ALL zones (Employee & Client)
-        for roi in self.roi_manager.get_all_rois():
-            is_present = presence.get(roi.id, False)
-            
-            # Use unified engine for both types
-            self.occupancy_engine.update(
-                zone_id=roi.id, 
-                is_person_present=is_present,
-                zone_type=roi.zone_type,
-                linked_employee_id=roi.linked_employee_id
-            )
+        # Update occupancy engine for ALL zones (Employee & Client) in one call;
+        # presence is keyed in ROI order, so it zips with get_all_rois()
+        rois = self.roi_manager.get_all_rois()
+        statuses = self.occupancy_engine.update_many(
+            (roi.id, is_present, roi.zone_type, roi.linked_employee_id)
+            for roi, is_present in zip(rois, presence.values())
+        )
+        
+        # Update ROI status for display
+        for roi, status in zip(rois, statuses):
+            if status != roi.status:
+                self.invalidate_stats()  # Sessions/visits may have been written
+                roi.status = status
+        
+        # Line Crossing Engine check
+        if self.line_engine:
+            # Check if currently in working hours
+            from config import RESTRICTED_DAYS, WORK_START, WORK_END, tashkent_now
+            now_tz = tashkent_now()
+            current_time_str = now_tz.strftime("%H:%M")
+            is_working_hours = not (now_tz.weekday() in RESTRICTED_DAYS or not (WORK_START <= current_time_str <= WORK_END))
             
-            # Update ROI status for display
-            status = self.occupancy_engine.get_zone_status(roi.id)
-            self.roi_manager.update_status(roi.id, status)
+            if is_working_hours:
+                new_cross = self.line_engine.update(detections)
+                if new_cross:
+                    for tid in new_cross:
+                        db.save_client_crossing(self.camera_db_id, tid, now_tz)
+    
+    def render(self, frame):
+        """Draw zones, detections and stats for the on-screen camera"""
+        detections = self.last_detections
         
         # Draw ROIs
         frame = self.roi_manager.draw_rois(
@@ -162,20 +190,8 @@ class CameraMonitor:
         # Draw person detections
         frame = self.detector.draw_detections(frame, detections)
         
-        # Check if currently in working hours
-        from config import RESTRICTED_DAYS, WORK_START, WORK_END, tashkent_now
-        now_tz = tashkent_now()
-        current_time_str = now_tz.strftime("%H:%M")
-        is_working_hours = not (now_tz.weekday() in RESTRICTED_DAYS or not (WORK_START <= current_time_str <= WORK_END))
-
-        # Line Crossing Engine check & draw
+        # Line Crossing Engine draw
         if self.line_engine:
-            if is_working_hours:
-                new_cross = self.line_engine.update(detections)
-                if new_cross:
-                    for tid in new_cross:
-                        db.save_client_crossing(self.camera_db_id, tid, now_tz)
-                    
             frame = self.line_engine.draw_line_and_stats(frame, draw_stats=True)
             
         # Draw employee stats overlay
@@ -183,6 +199,9 @@ class CameraMonitor:
         roi_positions = {}
         today = date.today()
         
+        # Employee, daily totals and client stats for all zones in one query (not per ROI)
+        place_stats = self._get_place_stats(today)
+        
         for roi in self.roi_manager.get_all_rois():
             # Skip client zones - they have their own visual indicator
             if roi.zone_type == "client":
@@ -196,11 +215,10 @@ class CameraMonitor:
                     elapsed = self.occupancy_engine.get_zone_time(roi.id)
                     
                     if elapsed >= CLIENT_ENTRY_THRESHOLD:
-                        pts = roi.get_polygon_array()
-                        M = cv2.moments(pts)
-                        if M["m00"] != 0:
-                            cx = int(M["m10"] / M["m00"])
-                            cy = int(M["m01"] / M["m00"]) + 50
+                        centroid = roi.get_centroid()
+                        if centroid is not None:
+                            cx = centroid[0]
+                            cy = centroid[1] + 50
                             
                             time_str = format_duration(elapsed)
                             
@@ -213,34 +231,24 @@ class CameraMonitor:
                             )
                 continue
                 
-            # Get ROI center position
-            pts = roi.get_polygon_array()
-            M = cv2.moments(pts)
-            if M["m00"] != 0:
-                cx = int(M["m10"] / M["m00"])
-                cy = int(M["m01"] / M["m00"])
-                roi_positions[roi.id] = (cx, cy)
+            # Get ROI center position (cached on the ROI)
+            centroid = roi.get_centroid()
+            if centroid is not None:
+                roi_positions[roi.id] = centroid
             
-            # Get employee info
-            employee = db.get_employee_by_place(roi.id)
-            employee_name = employee['name'] if employee else f"Place {roi.id}"
-            employee_id = employee['id'] if employee else None
+            # Get employee info and stats
+            stats = place_stats.get(roi.id, {})
+            employee_name = stats.get('employee_name') or f"Place {roi.id}"
             
-            # Get work time (daily total)
-            work_time = self.occupancy_engine.get_total_daily_time(roi.id)
-            
-            # Get client stats
-            if employee_id:
-                client_stats = db.get_client_stats_for_employee(employee_id, today)
-            else:
-                client_stats = db.get_client_stats_for_place(roi.id, today)
+            # Work time: historical daily total + current session
+            work_time = stats.get('work_time', 0.0) + self.occupancy_engine.get_zone_time(roi.id)
             
             roi_stats[roi.id] = {
                 'employee_name': employee_name,
                 'work_time': work_time,
-                'client_count': client_stats['client_count'],
-                'client_service_time': client_stats['total_service_time'],
-                'roi_points': roi.points  # Pass polygon points for positioning
+                'client_count': stats.get('client_count', 0),
+                'client_service_time': stats.get('total_service_time', 0.0),
+                'roi_bbox': roi.get_bbox()  # Cached polygon bounds for positioning
             }
         
         frame = draw_employee_stats_overlay(frame, roi_stats, roi_positions)
@@ -262,8 +270,13 @@ class CameraMonitor:
         rois = self.roi_manager.get_all_rois()
         occupied = sum(1 for r in rois if r.status == "OCCUPIED")
         
-        # USE DAILY TOTAL
-        total_time = sum(self.occupancy_engine.get_total_daily_time(r.id) for r in rois)
+        # USE DAILY TOTAL: today's recorded time (same per-zone totals the overlay
+        # caches, see _get_place_stats) + the live session
+        place_stats = self._get_place_stats(date.today())
+        total_time = sum(
+            place_stats.get(r.id, {}).get('work_time', 0.0) + self.occupancy_engine.get_zone_time(r.id)
+            for r in rois
+        )
         # total_time = sum(self.occupancy_engine.get_zone_time(r.id) for r in rois)
         
         return {
@@ -309,6 +322,16 @@ class WorkplaceMonitor:
             self.cameras.append(monitor)
             print(f"[CAM] Camera {cam_config.id}: {cam_config.name}")
         
+        # YOLO runs on its own thread; the UI loop only composes the freshest results
+        self.inference_worker = InferenceWorker(
+            self.detector, self.cameras, get_focus_camera=lambda: self.current_camera
+        )
+        
+        # Pre-rendered status frames (message -> template; callers draw on a copy)
+        self._error_frames = {}
+        # (text, BGR strip) of the camera info label; re-rendered on camera switch
+        self._camera_info = (None, None)
+        
         # Current camera index
         self.current_camera_idx = 0
         self.background_processing_idx = 0  # For Round-Robin background processing
@@ -383,10 +406,16 @@ class WorkplaceMonitor:
         # Set initial camera to one with ROIs
         self._set_initial_camera()
         
+        self.inference_worker.start()
+        
         print("\n Monitoring started! Press 'H' for help, 'Q' to quit\n")
         
+        # Pace the loop: sleep inside waitKey for whatever is left of the frame period
+        target_period = 1.0 / UI_TARGET_FPS
+        
         try:
             while self.running:
+                tick_start = time.perf_counter()
                 display_frame = None
                 
                 # ---------------------------------------------------------
@@ -394,43 +423,34 @@ class WorkplaceMonitor:
                 # ---------------------------------------------------------
                 display_frame = None
                 
-                # 1. READ frames from ALL cameras (non-blocking now thanks to threads)
-                # We need fresh frames for display when switching, even if not detections
-                frames = {}
-                for i, camera in enumerate(self.cameras):
-                    if not camera.is_connected:
-                        continue
-                    ret, frame = camera.stream.read_frame()
-                    if ret:
-                        frames[camera.camera_db_id] = frame
-                        
-                        # If this is the current camera, save for display
-                        if i == self.current_camera_idx:
-                            display_frame = frame.copy()
-                            
-                # 2. RUN DETECTION / TRACKING
+                # 1. APPLY DETECTIONS / TRACKING for ALL cameras. Capture runs on each
+                # StreamHandler thread and YOLO on InferenceWorker, so this needs no frames.
                 for camera in self.cameras:
-                    if camera.camera_db_id not in frames:
+                    # Only cameras that have delivered a frame
+                    if not camera.is_connected or not camera.stream.last_frame_time:
                         continue
                         
                     # OPTIMIZATION: Process only if ROIs exist
                     if not camera.roi_manager.get_all_rois():
                         continue
-                        
-                    frame = frames[camera.camera_db_id]
-                    
-                    # Run AI detection (YOLO)
-                    processed_frame, person_count = camera.process_frame(frame)
                     
-                    # If this was Current Camera, update display frame
-                    if camera == self.current_camera:
-                        display_frame = processed_frame
-
-                        # Draw person count
-                        cv2.putText(
-                            display_frame, f"Persons: {person_count}", (10, display_frame.shape[0] - 10),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2
-                        )
+                    camera.update_state()
+                
+                # 2. READ + DRAW the on-screen camera only
+                camera = self.current_camera
+                if camera.is_connected:
+                    ret, frame = camera.stream.read_frame()
+                    if ret:
+                        display_frame = frame
+                        
+                        if camera.roi_manager.get_all_rois():
+                            display_frame, person_count = camera.render(frame)
+                            
+                            # Draw person count
+                            cv2.putText(
+                                display_frame, f"Persons: {person_count}", (10, display_frame.shape[0] - 10),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2
+                            )
                 
                 # 3. UI OVERLAYS (on display frame only)
                 if display_frame is not None:
@@ -463,11 +483,15 @@ class WorkplaceMonitor:
                         self._draw_camera_info(status_frame)
                     cv2.imshow(self.window_name, status_frame)
                 
+                # Write checkpoint heartbeats queued during this tick
+                db.flush_checkpoints()
+                
                 # Auto-cycle cameras (ping-pong)
                 self._auto_cycle()
                 
-                # Handle keyboard
-                self._handle_keyboard()
+                # Handle keyboard (waits out the rest of the frame period; no wait if over budget)
+                elapsed = time.perf_counter() - tick_start
+                self._handle_keyboard(int((target_period - elapsed) * 1000))
         
         except KeyboardInterrupt:
             print("\n[WARN] Interrupted by user")
@@ -476,32 +500,45 @@ class WorkplaceMonitor:
             print("\n[INFO] Shutting down application...")
             # Stop Sync Service
             sync_service.stop()
+            self.inference_worker.stop()
             
             for camera in self.cameras:
                 camera.shutdown()
+            db.flush_checkpoints()
             cv2.destroyAllWindows()
             print(" Monitoring stopped")
     
     def _create_error_frame(self, message: str):
         """Create error/status frame"""
-        import numpy as np
-        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
-        cv2.putText(
-            frame, message, (500, 360),
-            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3
-        )
-        return frame
+        template = self._error_frames.get(message)
+        if template is None:
+            template = np.zeros((720, 1280, 3), dtype=np.uint8)
+            cv2.putText(
+                template, message, (500, 360),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3
+            )
+            self._error_frames[message] = template
+        # Camera info is drawn on top, so hand out a copy
+        return template.copy()
     
     def _draw_camera_info(self, frame):
         """Draw current camera info"""
         camera = self.current_camera
         text = f"[{self.current_camera_idx + 1}/{len(self.cameras)}] {camera.config.name}"
         
-        cv2.rectangle(frame, (0, 0), (len(text) * 12 + 20, 35), (0, 0, 0), -1)
-        cv2.putText(
-            frame, text, (10, 25),
-            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2
-        )
+        # Opaque label: render once per text, then paste
+        if self._camera_info[0] != text:
+            (text_w, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+            label = np.zeros((36, text_w + 20, 3), dtype=np.uint8)
+            cv2.putText(
+                label, text, (10, 25),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2
+            )
+            self._camera_info = (text, label)
+        
+        label = self._camera_info[1]
+        h, w = min(label.shape[0], frame.shape[0]), min(label.shape[1], frame.shape[1])
+        frame[:h, :w] = label[:h, :w]
         
 
         
@@ -613,9 +650,10 @@ class WorkplaceMonitor:
         elif self._osd_message:
             self._osd_message = None
     
-    def _handle_keyboard(self):
-        """Handle keyboard input"""
-        key = cv2.waitKey(1) & 0xFF
+    def _handle_keyboard(self, wait_ms: int = 1):
+        """Handle keyboard input, waiting up to wait_ms for a key (<= 0: just poll)"""
+        # pollKey() pumps GUI events without waitKey's minimum 1 ms sleep
+        key = (cv2.waitKey(wait_ms) if wait_ms > 0 else cv2.pollKey()) & 0xFF
         camera = self.current_camera
         
         if key == ord('q') or key == ord('Q'):
@@ -669,6 +707,7 @@ class WorkplaceMonitor:
             rois = camera.roi_manager.get_all_rois()
             if rois:
                 camera.roi_manager.delete_roi(rois[-1].id)
+                camera.invalidate_stats()
                 print("🗑️ ROI deleted")
             else:
                  print("ℹ️ No ROIs to delete")
@@ -719,6 +758,7 @@ class WorkplaceMonitor:
                         target_roi.linked_employee_id = new_id
                         db.update_roi_link(target_roi.id, new_id)
                         camera.roi_manager._save_to_json()
+                        camera.invalidate_stats()
                         
                         msg = f"Client #{target_roi.id} -> Zone #{new_id}"
                         print(f"🔗 {msg}")
@@ -730,6 +770,7 @@ class WorkplaceMonitor:
         elif key == ord('z') or key == ord('Z'):
              # Clear all ROIs for current camera (moved from C)
             camera.roi_manager.delete_all_rois()
+            camera.invalidate_stats()
             print("🧹 All ROIs cleared for current camera")
 
         elif key == ord('o') or key == ord('O'):
@@ -792,6 +833,7 @@ class WorkplaceMonitor:
                 zone_type=zone_type,
                 linked_employee_id=linked_employee_id
             )
+            camera.invalidate_stats()
             self._pending_roi_points = None
             self._waiting_zone_type = False
             print(f"✅ ROI saved as {zone_type} zone")
@@ -822,6 +864,7 @@ class WorkplaceMonitor:
             if roi:
                 print(f"   Found ROI: {roi.name} (ID: {roi.id})")
                 camera.roi_manager.delete_roi(roi.id)
+                camera.invalidate_stats()
                 print(f"🗑️ Deleted ROI '{roi.name}'")
             else:
                 print("ℹ️ No ROI under cursor to delete")
@@ -1,6 +1,7 @@
 import sys
 import os
 from pathlib import Path
+from urllib.parse import urlsplit
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent
@@ -28,7 +29,9 @@ if not CLOUD_DSN:
 if CLOUD_DSN.startswith("postgres://"):
     CLOUD_DSN = CLOUD_DSN.replace("postgres://", "postgresql://", 1)
 
-print(f"🌍 Connecting to Cloud DB: {CLOUD_DSN.split('@')[1]}")
+# Show host/db only — never credentials (a password may itself contain '@')
+_dsn = urlsplit(CLOUD_DSN)
+print(f"🌍 Connecting to Cloud DB: {_dsn.hostname or '?'}:{_dsn.port or 5432}{_dsn.path}")
 
 def migrate():
     try:
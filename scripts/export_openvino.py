@@ -4,9 +4,13 @@ Export YOLOv10s model to OpenVINO IR format (FP16).
 Usage:
     python scripts/export_openvino.py
     python scripts/export_openvino.py --model yolov10s.pt --imgsz 960
+    python scripts/export_openvino.py --batch 4   # one forward pass for 4 cameras
 
 This creates a directory like 'yolov10s_openvino_model/' next to the .pt file.
 The main detector.py will auto-detect and use this directory on startup.
+A static (batch 1) model still works with several cameras — the detector reads
+the batch from metadata.yaml and runs one frame per forward pass — but only a
+dynamic export (--batch > 1) infers all cameras in one pass.
 """
 import argparse
 import sys
@@ -16,7 +20,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
-def export_to_openvino(model_path: str, imgsz: int = 960, half: bool = True):
+def export_to_openvino(model_path: str, imgsz: int = 960, half: bool = True, batch: int = 1):
     """
     Export YOLO model to OpenVINO format.
     
@@ -24,6 +28,8 @@ def export_to_openvino(model_path: str, imgsz: int = 960, half: bool = True):
         model_path: Path to .pt model file
         imgsz: Input image size (default 960)
         half: Use FP16 quantization (default True for better speed)
+        batch: Frames per forward pass; > 1 exports a dynamic-batch model so
+               PersonDetector.detect_batch() runs all cameras in one inference
     """
     from ultralytics import YOLO
     
@@ -39,6 +45,7 @@ def export_to_openvino(model_path: str, imgsz: int = 960, half: bool = True):
     print(f"  Model:    {model_path}")
     print(f"  Format:   OpenVINO IR ({'FP16' if half else 'FP32'})")
     print(f"  ImgSize:  {imgsz}x{imgsz}")
+    print(f"  Batch:    {batch}{' (dynamic)' if batch > 1 else ''}")
     print("=" * 50)
     
     # Load model
@@ -50,7 +57,9 @@ def export_to_openvino(model_path: str, imgsz: int = 960, half: bool = True):
     export_path = model.export(
         format="openvino",
         half=half,
-        imgsz=imgsz
+        imgsz=imgsz,
+        batch=batch,
+        dynamic=batch > 1
     )
     
     print(f"\n✅ Export complete!")
@@ -93,6 +102,8 @@ def main():
                         help="Input image size (default: from config)")
     parser.add_argument("--fp32", action="store_true",
                         help="Use FP32 instead of FP16 (slower but more accurate)")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="Frames per forward pass (default: number of configured cameras)")
     
     args = parser.parse_args()
     
@@ -105,10 +116,16 @@ def main():
         model_path = args.model
         imgsz = args.imgsz
     
+    batch = args.batch
+    if batch is None:
+        from config import CAMERAS
+        batch = max(1, len(CAMERAS))
+    
     export_to_openvino(
         model_path=model_path,
         imgsz=imgsz,
-        half=not args.fp32
+        half=not args.fp32,
+        batch=batch
     )
 
 
@@ -0,0 +1,124 @@
+"""
+Export YOLOv10s model to a TensorRT engine (FP16, NVIDIA GPUs only).
+
+Usage:
+    python scripts/export_tensorrt.py
+    python scripts/export_tensorrt.py --model yolov10s.pt --imgsz 960 --batch 4
+
+This creates 'yolov10s.engine' next to the .pt file.
+The main detector.py will auto-detect and use it on startup (before OpenVINO).
+An engine is tied to the GPU and TensorRT version it was built with —
+re-run this script after changing either.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def export_to_tensorrt(model_path: str, imgsz: int = 960, half: bool = True, batch: int = 1):
+    """
+    Export YOLO model to a TensorRT engine.
+    
+    Args:
+        model_path: Path to .pt model file
+        imgsz: Input image size (must match YOLO_IMGSZ at runtime)
+        half: Build an FP16 engine (default True)
+        batch: Max frames per forward pass; > 1 builds a dynamic-batch engine
+               so PersonDetector.detect_batch() runs all cameras in one inference
+    """
+    from ultralytics import YOLO
+    
+    pt_path = Path(model_path)
+    if not pt_path.exists():
+        print(f"❌ Model file not found: {model_path}")
+        print(f"   Run 'python download_model.py' first to download the model.")
+        sys.exit(1)
+    
+    try:
+        import torch
+        if not torch.cuda.is_available():
+            print("❌ No CUDA GPU found — TensorRT engines need an NVIDIA GPU.")
+            print("   Use 'python scripts/export_openvino.py' on Intel CPUs instead.")
+            sys.exit(1)
+    except ImportError:
+        print("❌ PyTorch is not installed.")
+        sys.exit(1)
+    
+    print("=" * 50)
+    print(f"  TensorRT Export")
+    print("=" * 50)
+    print(f"  Model:    {model_path}")
+    print(f"  Format:   TensorRT engine ({'FP16' if half else 'FP32'})")
+    print(f"  ImgSize:  {imgsz}x{imgsz}")
+    print(f"  Batch:    {batch}{' (dynamic)' if batch > 1 else ''}")
+    print("=" * 50)
+    
+    # Load model
+    print(f"\n📦 Loading model: {model_path}")
+    model = YOLO(model_path)
+    
+    # Export to TensorRT
+    print(f"🔄 Building TensorRT engine (this may take several minutes)...")
+    export_path = model.export(
+        format="engine",
+        half=half,
+        imgsz=imgsz,
+        batch=batch,
+        dynamic=batch > 1,
+        device=0
+    )
+    
+    print(f"\n✅ Export complete!")
+    engine_path = Path(export_path)
+    print(f"   TensorRT engine saved to: {engine_path} ({engine_path.stat().st_size / (1024 * 1024):.1f} MB)")
+    
+    # Quick validation: load and run dummy inference
+    print(f"\n🧪 Validating exported engine...")
+    try:
+        import numpy as np
+        test_model = YOLO(str(engine_path), task="detect")
+        dummy_frame = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        test_model(dummy_frame, imgsz=imgsz, verbose=False)
+        print(f"✅ Validation passed! Engine loads and runs correctly.")
+    except Exception as e:
+        print(f"⚠️ Validation warning: {e}")
+        print(f"   The engine was built but may need investigation.")
+    
+    print(f"\n📋 Next steps:")
+    print(f"   1. The detector will auto-detect this engine on next startup")
+    print(f"   2. Set YOLO_USE_TENSORRT=true in .env (already default)")
+    print(f"   3. Run 'python main.py' to verify")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export YOLO model to a TensorRT engine")
+    parser.add_argument("--model", type=str, default=None,
+                        help="Path to .pt model (default: from config)")
+    parser.add_argument("--imgsz", type=int, default=None,
+                        help="Input image size (default: from config)")
+    parser.add_argument("--fp32", action="store_true",
+                        help="Build an FP32 engine instead of FP16")
+    parser.add_argument("--batch", type=int, default=None,
+                        help="Max frames per forward pass (default: number of configured cameras)")
+    
+    args = parser.parse_args()
+    
+    # Load defaults from config if not specified
+    from config import YOLO_MODEL, YOLO_IMGSZ, CAMERAS
+    model_path = args.model or YOLO_MODEL
+    imgsz = args.imgsz or YOLO_IMGSZ
+    batch = args.batch or max(1, len(CAMERAS))
+    
+    export_to_tensorrt(
+        model_path=model_path,
+        imgsz=imgsz,
+        half=not args.fp32,
+        batch=batch
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -90,6 +90,7 @@ class TestCheckpoint(unittest.TestCase):
         # Update
         time.sleep(0.1)
         self.test_db.update_session_checkpoint(cp_id, datetime.now(), 5.0)
+        self.test_db.flush_checkpoints()
         with self.test_db.get_session() as s:
             rec = s.query(Session).get(cp_id)
             self.assertEqual(rec.duration_seconds, 5.0)
@@ -176,5 +177,97 @@ class TestCheckpoint(unittest.TestCase):
         finally:
             core.occupancy_engine.CHECKPOINT_INTERVAL = orig_interval
 
+    def test_finalize_drops_pending_checkpoint(self):
+        """A queued heartbeat must not overwrite the finalized values on the next flush"""
+        print("\n[TEST] Finalize drops pending checkpoint")
+        start = datetime.now()
+        cp_id = self.test_db.save_session_checkpoint(self.place_id, self.emp_id, start)
+        visit_id = self.test_db.save_client_visit_checkpoint(self.place_id, self.emp_id, 1, start)
+
+        # Heartbeats queued, never flushed
+        self.test_db.update_session_checkpoint(cp_id, datetime.now(), 5.0)
+        self.test_db.update_client_visit_checkpoint(visit_id, datetime.now(), 5.0)
+
+        self.test_db.finalize_session_checkpoint(cp_id, datetime.now(), 10.0)
+        self.test_db.finalize_client_visit_checkpoint(visit_id, datetime.now(), 10.0)
+        self.assertEqual(self.test_db._pending_session_checkpoints, {})
+        self.assertEqual(self.test_db._pending_visit_checkpoints, {})
+
+        self.test_db.flush_checkpoints()
+        with self.test_db.get_session() as s:
+            rec = s.query(Session).get(cp_id)
+            self.assertEqual(rec.is_checkpoint, 0)
+            self.assertEqual(rec.duration_seconds, 10.0)
+            visit = s.query(ClientVisit).get(visit_id)
+            self.assertEqual(visit.is_checkpoint, 0)
+            self.assertEqual(visit.duration_seconds, 10.0)
+
+    def test_failed_flush_keeps_checkpoints_queued(self):
+        """A failed write (locked DB, disk full) must not lose queued heartbeats"""
+        print("\n[TEST] Failed flush keeps checkpoints queued")
+        start = datetime.now()
+        cp_id = self.test_db.save_session_checkpoint(self.place_id, self.emp_id, start)
+        visit_id = self.test_db.save_client_visit_checkpoint(self.place_id, self.emp_id, 1, start)
+        self.test_db.update_session_checkpoint(cp_id, datetime.now(), 5.0)
+        self.test_db.update_client_visit_checkpoint(visit_id, datetime.now(), 6.0)
+
+        def locked_db():
+            raise RuntimeError("database is locked")
+
+        real_get_session = self.test_db.get_session
+        self.test_db.get_session = locked_db
+        try:
+            self.test_db.flush_checkpoints()  # Logs and returns, the main loop keeps running
+        finally:
+            self.test_db.get_session = real_get_session
+
+        self.assertIn(cp_id, self.test_db._pending_session_checkpoints)
+        self.assertIn(visit_id, self.test_db._pending_visit_checkpoints)
+
+        # Next tick retries and writes them
+        self.test_db.flush_checkpoints()
+        self.assertEqual(self.test_db._pending_session_checkpoints, {})
+        self.assertEqual(self.test_db._pending_visit_checkpoints, {})
+        with self.test_db.get_session() as s:
+            self.assertEqual(s.query(Session).get(cp_id).duration_seconds, 5.0)
+            self.assertEqual(s.query(ClientVisit).get(visit_id).duration_seconds, 6.0)
+
+    def test_unflushed_checkpoints_written_on_shutdown(self):
+        """Shutdown (engine.shutdown() then db.flush_checkpoints(), as in main.py) persists queued heartbeats"""
+        print("\n[TEST] Unflushed checkpoints written on shutdown")
+        start = datetime.now()
+
+        # Checkpoint owned by an active zone: shutdown finalizes it with the live duration
+        active_id = self.test_db.save_session_checkpoint(self.place_id, self.emp_id, start)
+        # Checkpoints with no active tracker: only their queued heartbeat is left to write
+        idle_id = self.test_db.save_session_checkpoint(self.place_id, self.emp_id, start)
+        visit_id = self.test_db.save_client_visit_checkpoint(self.place_id, self.emp_id, 1, start)
+
+        self.test_db.update_session_checkpoint(active_id, datetime.now(), 3.0)
+        self.test_db.update_session_checkpoint(idle_id, datetime.now(), 7.0)
+        self.test_db.update_client_visit_checkpoint(visit_id, datetime.now(), 8.0)
+
+        engine = OccupancyEngine()
+        tracker = engine.get_or_create_tracker(self.place_id)
+        tracker.state = ZoneState.OCCUPIED
+        tracker.session_start = start
+        tracker.timer_start_time = time.time() - 5.0
+        tracker.checkpoint_db_id = active_id
+
+        engine.shutdown()
+        self.test_db.flush_checkpoints()
+
+        with self.test_db.get_session() as s:
+            active = s.query(Session).get(active_id)
+            self.assertEqual(active.is_checkpoint, 0)
+            self.assertGreaterEqual(active.duration_seconds, 5.0)
+
+            idle = s.query(Session).get(idle_id)
+            self.assertEqual(idle.duration_seconds, 7.0)
+            self.assertEqual(idle.is_checkpoint, 1)  # Closed by finalize_stale_checkpoints on next start
+
+            visit = s.query(ClientVisit).get(visit_id)
+            self.assertEqual(visit.duration_seconds, 8.0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy.dialects.postgresql import psycopg2
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import sync_service
+
+
+SESSION_KEYS = ["local_id", "branch_id", "place_id", "employee_id", "start_time",
+                "end_time", "duration_seconds", "session_date"]
+VISIT_KEYS = ["local_id", "branch_id", "place_id", "employee_id", "track_id",
+              "visit_date", "enter_time", "exit_time", "duration_seconds"]
+CHECKPOINT_KEYS = ["local_id", "branch_id", "place_id", "employee_id", "start_time",
+                   "duration_seconds", "session_date"]
+
+
+class TestCloudUpsertBatching(unittest.TestCase):
+    """The cloud upserts must compile to insertmanyvalues (multi-row VALUES pages)"""
+
+    def _assert_insertmanyvalues(self, stmt, keys):
+        compiled = stmt.compile(dialect=psycopg2.dialect(), column_keys=keys,
+                                for_executemany=True)
+        self.assertIsNotNone(compiled._insertmanyvalues,
+                             "executemany would send one INSERT per row")
+
+    def test_session_upsert(self):
+        self._assert_insertmanyvalues(sync_service._UPSERT_SESSIONS, SESSION_KEYS)
+
+    def test_client_visit_upsert(self):
+        self._assert_insertmanyvalues(sync_service._UPSERT_CLIENT_VISITS, VISIT_KEYS)
+
+    def test_checkpoint_upsert(self):
+        self._assert_insertmanyvalues(sync_service._UPSERT_CHECKPOINTS, CHECKPOINT_KEYS)
+
+
+class TestCloudCrossingInsert(unittest.TestCase):
+
+    def test_batch_is_one_statement_with_dedup(self):
+        """All crossings of a batch go out as one INSERT ... SELECT DISTINCT ... WHERE NOT EXISTS"""
+        rows = [
+            ("1", "Branch", "Entrance", track_id, datetime(2026, 1, 5, 10, track_id), date(2026, 1, 5))
+            for track_id in (1, 2, 3)
+        ]
+        compiled = sync_service._insert_new_crossings(rows).compile(dialect=psycopg2.dialect())
+        sql = str(compiled)
+
+        self.assertIn("INSERT INTO client_crossings", sql)
+        self.assertIn("SELECT DISTINCT", sql)
+        self.assertIn("NOT (EXISTS", sql)
+        self.assertEqual(sql.count("INSERT"), 1)
+        # Every value of every row is bound in the single statement
+        self.assertEqual(len(compiled.params), len(rows) * len(rows[0]))
+        self.assertIn(datetime(2026, 1, 5, 10, 3), compiled.params.values())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.detector import PersonDetector
+
+
+class _Array:
+    """Stand-in for a torch tensor (only .cpu().numpy() is used)"""
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float32)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class _Boxes:
+    def __init__(self, xyxy, conf):
+        self.xyxy = _Array(xyxy)
+        self.conf = _Array(conf)
+
+    def __len__(self):
+        return len(self.conf.values)
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class _Predictor:
+    """Ultralytics predictor after warmup: .model is the AutoBackend holding the export metadata"""
+    def __init__(self, metadata):
+        self.model = type("AutoBackend", (), {"metadata": metadata})()
+
+
+class FakeModel:
+    """Fake YOLO model: records each call's batch and returns `box` for every frame"""
+
+    def __init__(self, box=None, metadata=None):
+        self.box = box
+        self.calls = []
+        self.shapes = []
+        if metadata is not None:
+            self.predictor = _Predictor(metadata)
+
+    def __call__(self, frames, **kwargs):
+        self.calls.append(len(frames))
+        self.shapes.extend(frame.shape for frame in frames)
+        if self.box is None:
+            return [_Result(None) for _ in frames]
+        return [_Result(_Boxes([self.box], [0.9])) for _ in frames]
+
+
+class StaticBatchModel(FakeModel):
+    """Fake exported model with a static batch-1 input, like the shipped OpenVINO IR"""
+
+    def __call__(self, frames, **kwargs):
+        if len(frames) != 1:
+            raise RuntimeError(f"static model expects batch 1, got {len(frames)}")
+        self.calls.append(len(frames))
+        # One box per frame, its x offset tells the frames apart
+        x = float(frames[0][0, 0, 0])
+        return [_Result(_Boxes([[x, 10, x + 20, 50]], [0.9]))]
+
+
+class StubDetector(PersonDetector):
+    """PersonDetector around a fake model (ultralytics is not loaded)"""
+
+    def __init__(self, model, backend="OpenVINO", imgsz=960):
+        self.model = model
+        self.backend = backend
+        self.confidence = 0.35
+        self.imgsz = imgsz
+        self.device = None
+        self.half = False
+        self.max_batch = self._model_max_batch()
+
+
+class TestModelMaxBatch(unittest.TestCase):
+
+    def test_reads_export_metadata(self):
+        """Batch limit comes from metadata['args']['dynamic'] and metadata['batch']"""
+        cases = [
+            ({"batch": 1, "args": {"dynamic": False}}, 1),
+            ({"batch": 4, "args": {"dynamic": False}}, 1),  # Static graph: batch is the fixed shape
+            ({"batch": 4, "args": {"dynamic": True}}, 4),
+            ({"args": {"dynamic": True}}, 1),
+            ({"batch": 0, "args": {"dynamic": True}}, 1),
+            ({}, 1),
+        ]
+        for metadata, expected in cases:
+            with self.subTest(metadata=metadata):
+                detector = StubDetector(FakeModel(metadata=metadata))
+                self.assertEqual(detector.max_batch, expected)
+
+    def test_missing_predictor_is_treated_as_static(self):
+        """No warmup metadata: assume the safe batch of 1"""
+        self.assertEqual(StubDetector(FakeModel()).max_batch, 1)
+
+    def test_pytorch_has_no_limit(self):
+        model = FakeModel(metadata={"batch": 1, "args": {"dynamic": False}})
+        self.assertIsNone(StubDetector(model, backend="PyTorch").max_batch)
+
+
+class TestDetectBatch(unittest.TestCase):
+
+    def test_static_model_runs_one_frame_per_call(self):
+        """Several cameras on a batch-1 model: every frame is still detected"""
+        model = StaticBatchModel()
+        detector = StubDetector(model)
+        self.assertEqual(detector.max_batch, 1)
+
+        frames = [np.full((100, 100, 3), i * 10, dtype=np.uint8) for i in range(4)]
+        results = detector.detect_batch(frames, [1.0, 1.0, 2.0, 1.0])
+
+        self.assertEqual(model.calls, [1, 1, 1, 1])
+        self.assertEqual(len(results), 4)
+        # Results stay in frame order, each scaled by its own factor
+        self.assertEqual(results[0][0].bbox, (0, 10, 20, 50))
+        self.assertEqual(results[1][0].bbox, (10, 10, 30, 50))
+        self.assertEqual(results[2][0].bbox, (40, 20, 80, 100))
+        self.assertEqual(results[3][0].bbox, (30, 10, 50, 50))
+
+    def test_dynamic_model_uses_export_batch(self):
+        """A dynamic export is fed chunks of its export batch"""
+        model = FakeModel(metadata={"batch": 2, "args": {"dynamic": True}})
+        detector = StubDetector(model)
+
+        results = detector.detect_batch([np.zeros((8, 8, 3), np.uint8)] * 5)
+        self.assertEqual(model.calls, [2, 2, 1])
+        self.assertEqual(results, [[]] * 5)
+
+    def test_pytorch_model_takes_whole_batch(self):
+        """The .pt model accepts any batch size: one call for all frames"""
+        model = FakeModel()
+        detector = StubDetector(model, backend="PyTorch")
+
+        detector.detect_batch([np.zeros((8, 8, 3), np.uint8)] * 3)
+        self.assertEqual(model.calls, [3])
+
+
+class TestDownscale(unittest.TestCase):
+
+    def test_boxes_map_back_to_original_frame(self):
+        """Boxes found on the downscaled frame come back in full-frame pixels"""
+        cases = [
+            # (frame h, w), model input (h, w), box on the small frame, expected box
+            ((1080, 1920), (540, 960), [100, 50, 300, 250], (200, 100, 600, 500)),
+            ((720, 1280), (540, 960), [96, 54, 192, 108], (128, 72, 256, 144)),
+            ((1920, 1080), (960, 540), [30, 60, 90, 120], (60, 120, 180, 240)),
+        ]
+        for (h, w), small_shape, box, expected in cases:
+            with self.subTest(frame=(w, h)):
+                model = FakeModel(box=box)
+                detector = StubDetector(model, backend="PyTorch")
+                frame = np.zeros((h, w, 3), np.uint8)
+
+                small, scale = detector.downscale(frame)
+                self.assertEqual(small.shape[:2], small_shape)
+                self.assertAlmostEqual(scale, w / small_shape[1])
+
+                det = detector.detect_batch([small], [scale])[0][0]
+                self.assertEqual(det.bbox, expected)
+                self.assertEqual(det.center, ((expected[0] + expected[2]) // 2,
+                                              (expected[1] + expected[3]) // 2))
+                # detect() does the same in one step, feeding the model the small frame
+                self.assertEqual(detector.detect(frame)[0].bbox, expected)
+                self.assertEqual(model.shapes[-1][:2], small_shape)
+
+    def test_small_frame_is_passed_through(self):
+        detector = StubDetector(FakeModel(), backend="PyTorch")
+        frame = np.zeros((480, 640, 3), np.uint8)
+        small, scale = detector.downscale(frame)
+        self.assertIs(small, frame)
+        self.assertEqual(scale, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
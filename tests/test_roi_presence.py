@@ -0,0 +1,109 @@
+import unittest
+import sys
+from math import gcd
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.roi_manager import ROI, ROIManager
+
+# Camera with no zones in rois.json or the DB; the tests fill manager.rois in memory
+CAM_ID = 998
+
+
+def _random_polygon(rng, max_vertices=9):
+    """Simple (star-shaped) integer polygon: sorted angles, random radii"""
+    n = int(rng.integers(3, max_vertices + 1))
+    cx, cy = rng.integers(100, 1800), rng.integers(100, 1000)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = rng.uniform(20, 300, n)
+    xs = np.round(cx + radii * np.cos(angles)).astype(int)
+    ys = np.round(cy + radii * np.sin(angles)).astype(int)
+    points = list(dict.fromkeys(zip(xs.tolist(), ys.tolist())))
+    return points if len(points) >= 3 else _random_polygon(rng, max_vertices)
+
+
+def _edge_points(points):
+    """Every vertex plus the integer points lying exactly on each edge"""
+    result = list(points)
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        dx, dy = x2 - x1, y2 - y1
+        step = gcd(dx, dy)
+        for k in range(1, step):
+            result.append((x1 + dx // step * k, y1 + dy // step * k))
+    return result
+
+
+def _scalar_presence(rois, point):
+    return {roi.id: cv2.pointPolygonTest(roi.get_polygon_array(), point, False) >= 0
+            for roi in rois}
+
+
+class TestVectorizedPresence(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(1234)
+        self.rois = [ROI(id=i + 1, camera_id=CAM_ID, name=f"Zone {i + 1}",
+                         points=_random_polygon(self.rng))
+                     for i in range(12)]
+        # Axis-aligned and shared-edge zones: many exact on-edge hits
+        self.rois.append(ROI(id=100, camera_id=CAM_ID, name="Box", points=[(10, 10), (60, 10), (60, 40), (10, 40)]))
+        self.rois.append(ROI(id=101, camera_id=CAM_ID, name="Next box", points=[(60, 10), (90, 10), (90, 40), (60, 40)]))
+        self.manager = ROIManager(CAM_ID)
+        self.manager.rois = {roi.id: roi for roi in self.rois}
+
+    def _check_points(self, points):
+        # Force the vectorized path even for a single person
+        self.manager.VECTORIZE_MIN_PAIRS = 0
+        for point in points:
+            expected = _scalar_presence(self.rois, point)
+            actual = self.manager.check_presence([point])
+            self.assertEqual(actual, expected, f"point {point}")
+
+    def test_random_points_match_point_polygon_test(self):
+        xs = self.rng.integers(0, 1920, 2000)
+        ys = self.rng.integers(0, 1080, 2000)
+        self._check_points(list(zip(xs.tolist(), ys.tolist())))
+
+    def test_vertices_and_edges_count_as_inside(self):
+        points = []
+        for roi in self.rois:
+            points.extend(_edge_points(roi.points))
+        self._check_points(points)
+
+    def test_many_persons_use_vectorized_path(self):
+        """Above VECTORIZE_MIN_PAIRS the result matches the per-ROI scalar loop"""
+        xs = self.rng.integers(0, 1920, 40)
+        ys = self.rng.integers(0, 1080, 40)
+        centers = list(zip(xs.tolist(), ys.tolist())) + [(60, 25), (10, 10)]
+        self.assertGreaterEqual(len(self.rois) * len(centers), ROIManager.VECTORIZE_MIN_PAIRS)
+
+        expected = {roi.id: any(roi.contains_point(c) for c in centers) for roi in self.rois}
+        actual = self.manager.check_presence(centers)
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(actual), [roi.id for roi in self.rois])
+
+    def test_reassigned_points_update_geometry(self):
+        """Moving a zone after construction: cached bbox, centroid and edge table follow"""
+        self.manager.VECTORIZE_MIN_PAIRS = 0
+        box = self.manager.rois[100]
+        self.assertTrue(self.manager.check_presence([(30, 25)])[100])
+
+        box.points = [(200, 200), (300, 200), (300, 260), (200, 260)]
+
+        self.assertEqual(box.get_bbox(), (200, 200, 300, 260))
+        self.assertEqual(box.get_centroid(), (250, 230))
+        self.assertFalse(box.contains_point((30, 25)))
+        self.assertTrue(box.contains_point((250, 230)))
+        # The edge table built by the first call must not be reused
+        self.assertFalse(self.manager.check_presence([(30, 25)])[100])
+        self.assertTrue(self.manager.check_presence([(250, 230)])[100])
+        self._check_points(_edge_points(box.points))
+
+
+if __name__ == '__main__':
+    unittest.main()